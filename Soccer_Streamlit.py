@@ -3,11 +3,24 @@
 
 # In[2]:
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import altair as alt
 import numpy as np
-import math
-import streamlit.components.v1 as components
+import os
+import uuid
+from match_analysis import (calc_game_momentum, compute_game_statistics, create_game_statistics_chart,
+                            create_momentum_chart, create_passing_map, create_shot_map)
+from possessions import segment_possessions, possession_summary
+from expected_threat import XT_COLUMNS, load_or_fit_xt, rate_actions
+from query_layer import KickLogicDB
+from team_dimension import build_team_dimension, TeamLookup
+from quantile_sketch import build_group_sketches
+from match_reports import load_report
+from api_client import KickLogicClient
+from downsampling import build_resolutions, pick_resolution, MAX_CHART_POINTS
+from prefetch import Prefetcher
+from valuations import PLAYERS_PATH, ValuationEngine, create_region_average_chart, create_region_valuation_chart, create_player_attribute_chart
 
 
 # Function to load data
@@ -16,6 +29,96 @@ def load_data(path):
     data = pd.read_csv(path)
     return data
 
+# Function to open the shared query layer over the datasets
+@st.cache_resource  # One connection shared by every session
+def get_db():
+    return KickLogicDB('.')
+
+# Function to connect to a shared analytics_api.py instance when KICKLOGIC_API_URL is set (None computes locally)
+@st.cache_resource  # One pooled keep-alive client shared by every session
+def get_api_client():
+    api_url = os.environ.get('KICKLOGIC_API_URL')
+    return KickLogicClient(api_url) if api_url else None
+
+# Function to build the team dimension with id/name/league lookups
+@st.cache_resource
+def load_teams():
+    return TeamLookup(build_team_dimension(load_data('teams_enriched.csv')))
+
+# Function to build the per-role quantile sketches of the playerank table
+@st.cache_resource  # Kept as one mutable object so new matches can be folded in with update_group_sketches
+def load_role_sketches():
+    playerank = get_db().playerank(['roleCluster', 'playerankScore', 'minutesPlayed', 'goalScored'])
+    return build_group_sketches(playerank, 'roleCluster', ['playerankScore', 'minutesPlayed', 'goalScored'])
+
+# Function to load the player valuation engine with its precomputed aggregates
+@st.cache_resource
+def load_valuations():
+    return ValuationEngine(load_data(PLAYERS_PATH))
+
+# Function to precompute the downsampled season momentum curves of every team
+@st.cache_data
+def load_momentum_resolutions():
+    season_momentum = get_db().season_momentum()
+    season_momentum['name'] = season_momentum['team_id'].map(load_teams().name)
+    return build_resolutions(season_momentum)
+
+# Function to load the expected threat grid, fitting and saving it on first use or when the saved model is outdated
+@st.cache_resource
+def load_xt(model_path):
+    return load_or_fit_xt(model_path, lambda: get_db().actions(XT_COLUMNS))
+
+# Function to load one game's actions, scored with xT
+@st.cache_data(max_entries=256)
+def load_game_data(game_id):
+    game_data = get_db().game_actions(game_id)
+    return game_data.assign(xt_added=rate_actions(game_data, load_xt('xt_model.npz')))
+
+# Function to load one game's possession chains, segmented from its cached actions
+@st.cache_data(max_entries=256)
+def load_game_possessions(game_id):
+    return segment_possessions(load_game_data(game_id))
+
+# Function to load one game's action counts, from the analytics API when one is configured
+@st.cache_data(max_entries=256)
+def load_game_statistics(game_id):
+    api = get_api_client()
+    return api.match_statistics(game_id) if api else compute_game_statistics(load_game_data(game_id))
+
+# Function to load one game's momentum, from the analytics API when one is configured
+@st.cache_data(max_entries=256)
+def load_game_momentum(game_id):
+    api = get_api_client()
+    return api.match_momentum(game_id) if api else calc_game_momentum(load_game_data(game_id), game_id)
+
+# Function to build the Vega-Lite specs main1 shows when 'All Players' is selected (same keys as a pre-rendered report)
+@st.cache_data(max_entries=256)
+def load_game_chart_specs(game_id):
+    game_data = load_game_data(game_id)
+    specs = {}
+    game_statistics = load_game_statistics(game_id)
+    if game_statistics is not None:
+        specs['statistics'] = create_game_statistics_chart(game_statistics).to_dict()
+    for team_id in game_data['team_id'].unique():
+        specs[f'passes_{team_id}'] = create_passing_map(game_data[game_data['team_id'] == team_id].copy(), team_id).to_dict()
+        specs[f'shots_{team_id}'] = create_shot_map(game_data, team_id).to_dict()
+    game_momentum = load_game_momentum(game_id)
+    if game_momentum is not None:
+        specs['momentum'] = create_momentum_chart(game_momentum).to_dict()
+    return specs
+
+# Function to warm every per-game cache the Match Analysis page reads
+def warm_game(game_id):
+    load_game_chart_specs(game_id)
+    load_game_possessions(game_id)
+
+# Function to start the shared prefetcher, warming the most viewed games first
+@st.cache_resource
+def get_prefetcher():
+    prefetcher = Prefetcher(warm_game)
+    prefetcher.warm_popular()
+    return prefetcher
+
 # Main function for Streamlit app
 def main1():
 
@@ -34,35 +137,51 @@ def main1():
         * *Negative momentum implies team 2 had the advantage in play at that time*
     """)
 
-    # Load the data
-    data_path = 'enriched_actions_prem.csv'  # Update path if needed
-    data = load_data(data_path)
-    match_data_path = 'match_details.csv'  # Update path if needed
-    match_data = load_data(match_data_path)
+    # Connect to the query layer
+    db = get_db()
 
     # Sidebar - Game selection
     st.sidebar.header('Game Selection')
-    sorted_unique_teams = sorted(match_data['team_1'].unique())
-    team_1 = st.sidebar.selectbox('Choose Team 1', sorted_unique_teams)
-    filtered_team2 = match_data[match_data['team_1'] == team_1]
-    sorted_unique_opponents = sorted(filtered_team2['team_2'].unique())
-    team_2 = st.sidebar.selectbox('Choose Team 2', sorted_unique_opponents)
+    team_1 = st.sidebar.selectbox('Choose Team 1', db.home_teams())
+    team_2 = st.sidebar.selectbox('Choose Team 2', db.opponents(team_1))
+
+    # Warm every game of this pairing (then team_1's other games) while the date is being picked
+    prefetcher = get_prefetcher()
+    session_id = st.session_state.setdefault('prefetch_owner', uuid.uuid4().hex)
+    prefetcher.prefetch(db.team_game_ids(team_1, team_2), owner=session_id)
     
     # Get a sorted list of match dates where team_1 played against team_2
-    filtered_matches = match_data[(match_data['team_1'] == team_1) & (match_data['team_2'] == team_2)]
-    sorted_match_dates = sorted(filtered_matches['game_date'].unique())
-    match_date = st.sidebar.selectbox('Choose Match Date', sorted_match_dates)
+    match_date = st.sidebar.selectbox('Choose Match Date', db.match_dates(team_1, team_2))
     
     # Get the game_id for the selected match
-    selected_game = filtered_matches[filtered_matches['game_date'] == match_date]['game_id'].iloc[0]
+    selected_game = db.game_id(team_1, team_2, match_date)
     
-    # Filter data based on selection
-    game_data = data[data['game_id'] == selected_game]
+    if selected_game is None:
+        st.write("No games are available for this selection.")
+        return
+
+    # Count each newly opened game towards the popular games warmed at server start
+    if st.session_state.get('last_viewed_game') != selected_game:
+        st.session_state['last_viewed_game'] = selected_game
+        prefetcher.record_view(selected_game)
+
+    # Query only the actions of the selected game
+    game_data = load_game_data(selected_game)
+    if game_data.empty:
+        st.write("No validated action data is available for this game.")
+        return
+
+    # Pre-rendered charts from prerender_reports.py, else the cached (possibly prefetched) chart specs
+    report = load_report(game_data) or load_game_chart_specs(selected_game)
 
 
     # Display game statistics
     st.header('Game Statistics')
-    display_game_statistics(game_data)
+    if 'statistics' in report:
+        st.vega_lite_chart(spec=report['statistics'])
+    else:
+        display_game_statistics(game_data, load_game_statistics(selected_game))
+    display_possession_summary(load_game_possessions(selected_game), game_data)
     
     # Team selection toggle for pass map
     st.header('Passing Map')
@@ -70,7 +189,7 @@ def main1():
     if len(teams) > 1:  # Ensure there are at least two teams
         selected_team = st.radio('Choose a team to view passes', options=teams)
         selected_team_data = game_data[game_data['team_name'] == selected_team]
-        selected_team_id = selected_team_data.iloc[0]['team_id']
+        selected_team_id = load_teams().team_id(selected_team)
         # Get list of players from the selected team
         players = selected_team_data['player_name'].dropna().unique()
 
@@ -81,8 +200,8 @@ def main1():
         sorted_players = [name for _, name in sorted(zip(last_names, players))]
         
         # Add an option to select all players
-        sorted_players = np.insert(sorted_players, 0, 'All Players')
-        players_display = [name.encode('utf-8').decode('unicode_escape') for name in sorted_players]
+        # Names are decoded once at ingest (validation.py)
+        players_display = ['All Players'] + sorted_players
 
                 
         # Allow user to select a player from the team
@@ -91,9 +210,13 @@ def main1():
         # Filter data based on selected player if a specific player is chosen
         if selected_player != 'All Players':
             selected_team_data = selected_team_data[selected_team_data['player_name'] == selected_player]
+        st.caption('Expected threat added by successful passes, crosses, dribbles and take-ons: {:.2f}'.format(selected_team_data['xt_added'].sum()))
         # Create a passing map for the selected team
-        passing_map_chart = create_passing_map(selected_team_data, selected_team_id)
-        st.altair_chart(passing_map_chart, use_container_width=True)
+        if selected_player == 'All Players' and f'passes_{selected_team_id}' in report:
+            st.vega_lite_chart(spec=report[f'passes_{selected_team_id}'], use_container_width=True)
+        else:
+            passing_map_chart = create_passing_map(selected_team_data, selected_team_id)
+            st.altair_chart(passing_map_chart, use_container_width=True)
     
     else:
         st.write("Not enough teams to toggle between.")
@@ -102,385 +225,55 @@ def main1():
     st.header('Shot Map')
     if len(teams) > 1:
         selected_team_shots = st.radio('Choose a team to view shots', options=teams, key='team_selection_shots')
-        selected_team_shots_data = game_data[game_data['team_name'] == selected_team_shots]
-        selected_team_shots_id = selected_team_shots_data.iloc[0]['team_id']
+        selected_team_shots_id = load_teams().team_id(selected_team_shots)
         # Create a shot map for the selected team
-        shot_map_chart = create_shot_map(game_data, selected_team_shots_id)
-        st.altair_chart(shot_map_chart, use_container_width=True)
+        if f'shots_{selected_team_shots_id}' in report:
+            st.vega_lite_chart(spec=report[f'shots_{selected_team_shots_id}'], use_container_width=True)
+        else:
+            shot_map_chart = create_shot_map(game_data, selected_team_shots_id)
+            st.altair_chart(shot_map_chart, use_container_width=True)
     else:
         st.write("Not enough teams to toggle between for shots.")
         
     # Calculate and display momentum
     st.header('Match Momentum')
     st.write('By analyzing pass and shot actions as well as the position on the field that they occured, we can understand who was controlling the match at a given time period. ')
-    momentum_chart2 = create_momentum_chart(calc_game_momentum(game_data,selected_game))
-    st.altair_chart(momentum_chart2, use_container_width=True)
-
-
-# Function to create a passing map
-def calculate_angle(row):
-    start_x, start_y = row['start_x'], row['start_y']
-    end_x, end_y = row['end_x'], row['end_y']
-
-    # Calculate the angle in radians
-    angle_rad = math.atan2(end_y - start_y, end_x - start_x)
-
-    # Ensure the angle is between 0 and 2*pi
-    angle_rad = (angle_rad + 2 * math.pi) % (2 * math.pi)
-
-    # Convert the angle to degrees
-    angle_deg = math.degrees(angle_rad)
-    
-    return angle_deg
-
-# Function to create a passing map
-def create_passing_map(game_data, selected_team):
-    # Filter for 'pass' actions for the selected team
-    pass_actions = game_data[(game_data['type_name'] == 'pass') & (game_data['team_id'] == selected_team)]
-
-    # Determine if the pass was successful
-    pass_actions['pass_outcome'] = pass_actions['result_name'].apply(lambda x: 'success' if x == 'success' else 'fail')
-    pass_actions['angle'] = pass_actions.apply(calculate_angle, axis=1)
-    #st.write(pass_actions.head(50))
-    # Define field dimensions; you might adjust these based on the coordinate system in your data
-    # Store as variables we can easily reuse for the plots
-    field_length_min =  0.0
-    field_length_max = 105.0
-    field_width_min = 0.0
-    field_width_max = 68.0
-
-    # Create the base line chart with varying line width for direction
-    pass_chart = alt.Chart(pass_actions).mark_line().encode(
-        x=alt.X('start_x:Q', scale=alt.Scale(domain=(field_length_min, field_length_max)), title='Start X'),
-        y=alt.Y('start_y:Q', scale=alt.Scale(domain=(field_width_min, field_width_max)), title='Start Y'),
-        x2='end_x:Q',
-        y2='end_y:Q',
-        color=alt.condition(
-            alt.datum.pass_outcome == 'success',
-            alt.value('green'),  # The pass was successful
-            alt.value('red')     # The pass was not successful
-        ),
-        tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'pass_outcome', 'player_name']
-    ).properties(
-        title='Pass Start and End Points',
-        width=700,
-        height=400  # Keeping the aspect ratio of the field in mind
-    )
-
-    # # Adding arrows to the end of each line
-    # # Arrow chart for indicating direction
-    # arrow_chart = alt.Chart(pass_actions).mark_point(
-    #     shape='arrow', 
-    #     filled=True,
-    #     size=100  # Adjust size as needed
-    # ).encode(
-    #     x='end_x:Q',
-    #     y='end_y:Q',
-    #     angle=alt.Angle('angle', scale=alt.Scale(domain=[0, 360])),
-    #     color=alt.condition(
-    #         alt.datum.pass_outcome == 'success',
-    #         alt.value('green'),  # The pass was successful
-    #         alt.value('red')     # The pass was not successful
-    #     ),
-    #     tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'angle', 'pass_outcome']  # Adding start_x and start_y to tooltip
-    # )
-
-    arrow_chart = alt.Chart(pass_actions).mark_point(
-    shape='circle',
-    filled=True,
-    size=100,  # Adjust size as needed
-).encode(
-    x='end_x:Q',
-    y='end_y:Q',
-    theta=alt.Theta('angle', title='Direction'),  # Specify the direction using the angle
-    color=alt.condition(
-        alt.datum.pass_outcome == 'success',
-        alt.value('green'),  # The pass was successful
-        alt.value('red')     # The pass was not successful
-    ),
-    tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'angle', 'pass_outcome']  # Adding start_x and start_y to tooltip
-)
-    # Combine the line chart and the arrow chart
-    combined_chart = pass_chart + arrow_chart
-    combined_chart = combined_chart.properties(
-        title='Pass Start and End Points',
-        width=700,
-        height=400
-    )
-
-    return combined_chart
-
-def create_shot_map(game_data, selected_team):
-    shot_data = game_data[(game_data['type_name'] == 'shot') & (game_data['team_id'] == selected_team)]
-
-    field_length_min =  0.0
-    field_length_max = 105.0
-    field_width_min = 0.0
-    field_width_max = 68.0
-    
-    minimum_point_size = 50  
-
-    # Create points for shots
-    shots = alt.Chart(shot_data).mark_point(filled=True).encode(
-    x=alt.X('start_x', scale=alt.Scale(domain=(0, field_length_max))),
-    y=alt.Y('start_y', scale=alt.Scale(domain=(0, field_width_max))),
-    color='result_name:N',
-    size=alt.Size('result_name:N', 
-                  scale=alt.Scale(range=[minimum_point_size, 2 * minimum_point_size]), 
-                  legend=None),
-    tooltip=['player_name', 'time_minutes', 'start_x', 'start_y',  'result_name']
-    ).properties(
-        width=700,
-        height=400
-    )
-
-    return shots
-
-def calc_action_weight(result_name, type_name):
-
-    action_weights = {
-        "success" : {"pass": 1, "shot": 5},
-        "fail" : {"pass": -1, "shot": 1}
-    }
-    try:
-      weight = action_weights[result_name][type_name]
-    except:
-      weight = 0
-    return weight
-
-
-def calc_game_momentum(game_data, game_id, perspective_team_id = 0, weight_span = 3):
-
-    # Convert time from seconds to minutes for easier processing
-    game_data['time_minutes'] = game_data['time_seconds'] // 60 + 45 * (game_data['period_id'] -1)
-
-    # Define action weights
-    action_weights = {"pass": 1, "shot": 2}
-
-    # Filter for relevant actions
-    relevant_actions = game_data[game_data['type_name'].isin(action_weights.keys())]
-
-    # Avoid SettingWithCopyWarning by creating a new DataFrame instead of modifying a slice
-    relevant_actions_fixed = relevant_actions.copy()
-    relevant_actions_fixed['action_weight'] = relevant_actions_fixed.apply(lambda x: calc_action_weight(x.result_name, x.type_name), axis=1)
-
-    # Group the data by game, minute, and team to count weighted actions and calculate the average x-coordinate
-    weighted_grouped_data = relevant_actions_fixed.groupby(['game_id', 'time_minutes', 'team_name']).agg(
-        weighted_actions=pd.NamedAgg(column='action_weight', aggfunc='sum'),
-        avg_start_x=pd.NamedAgg(column='start_x', aggfunc='mean')
-    ).reset_index()
-
-    # # Calculate momentum
-    weighted_grouped_data['momentum'] = ((weighted_grouped_data['avg_start_x'] - 50) / 50) * weighted_grouped_data['weighted_actions']
-
-    # # Dynamically determine the teams based on the data
-    teams = weighted_grouped_data['team_name'].unique()
-    if len(teams) != 2:
-        print("Error: There are not exactly two teams in the game data.")
-        return None
-
-    if perspective_team_id == 0:
-        team_1_id, team_2_id = teams[0], teams[1]
+    if 'momentum' in report:
+        st.vega_lite_chart(spec=report['momentum'], use_container_width=True)
     else:
-        team_1_id = perspective_team_id
-        team_2_id = np.setdiff1d(weighted_grouped_data['team_name'].unique(), perspective_team_id)[0]
-
-    # weighted average by teamId
-    team1_df = weighted_grouped_data[weighted_grouped_data['team_name'] == team_1_id]
-    team2_df = weighted_grouped_data[weighted_grouped_data['team_name'] == team_2_id]
-    team1_df['weighted_avg_momentum'] = team1_df.iloc[:,5].ewm(span=weight_span).mean()
-    team2_df['weighted_avg_momentum'] = -1 * team2_df.iloc[:,5].ewm(span=weight_span).mean()
-    team2_df['momentum'] = -1 * team2_df['momentum']
-
-    # # Adjust momentum calculation considering the team identity.
-    weighted_grouped_data = pd.concat([team1_df, team2_df])
-
-    # # Create a DataFrame for momentum difference per minute
-    momentum_per_minute = weighted_grouped_data.groupby('time_minutes')[['momentum', 'weighted_avg_momentum']].sum().reset_index()
-
-    # # Normalize the momentum values to be between -1 and 1
-    max_momentum = momentum_per_minute['momentum'].abs().max()
-    momentum_per_minute['momentum'] = momentum_per_minute['momentum'].apply(lambda x: x / max_momentum)
-    momentum_per_minute['weighted_avg_momentum'] = momentum_per_minute['weighted_avg_momentum'].apply(lambda x: x / max_momentum)
-
-    # Assign 'Team 1' or 'Team 2' based on the sign of the momentum
-    momentum_per_minute['team'] = momentum_per_minute['momentum'].apply(
-        lambda x: team_1_id if x >= 0 else team_2_id
-    )
-    
-    return momentum_per_minute
-
-def create_momentum_chart(game_momentum_df):
-    game_momentum_df['pos_momentum'] = game_momentum_df['momentum'].apply(lambda x: max(x, 0))
-    game_momentum_df['neg_momentum'] = game_momentum_df['momentum'].apply(lambda x: min(x, 0))
-
-    posChart = alt.Chart(game_momentum_df).mark_area().encode(
-        x="time_minutes",
-        y=alt.Y("pos_momentum", scale=alt.Scale(domain=[-1, 1])),
-        tooltip=["time_minutes", "pos_momentum", "team"]  # Added team to tooltip
-
-    )
-
-    negChart = alt.Chart(game_momentum_df).mark_area().encode(
-        x="time_minutes",
-        y=alt.Y("neg_momentum", scale=alt.Scale(domain=[-1, 1])),
-        fill = alt.value("red"),
-        tooltip=["time_minutes", "neg_momentum", "team"]  # Added team to tooltip
-    )
-
-    game_momentum_df['pos_momentum_weighted'] = game_momentum_df['weighted_avg_momentum'].apply(lambda x: max(x, 0))
-    game_momentum_df['neg_momentum_weighted'] = game_momentum_df['weighted_avg_momentum'].apply(lambda x: min(x, 0))
-
-    posChart_w = alt.Chart(game_momentum_df).mark_area().encode(
-        x="time_minutes",
-        y=alt.Y("pos_momentum_weighted", title = "Momentum", scale=alt.Scale(domain=[-1, 1])),
-        #tooltip=["time_minutes", "pos_momentum_weighted", "team"]  # Added team to tooltip
-        fill=alt.ColorValue('#0068c9')
-
-    )
-
-    negChart_w = alt.Chart(game_momentum_df).mark_area().encode(
-        x="time_minutes",
-        y=alt.Y("neg_momentum_weighted", title = "Momentum", scale=alt.Scale(domain=[-1, 1])),
-        #tooltip=["time_minutes", "neg_momentum_weighted", "team"],
-        fill = alt.ColorValue('#83c9ff')
-    )
-
-    # Calculate the midpoint of the time range
-    midpoint = game_momentum_df['time_minutes'].max() / 2
-    
-    # Extract the team names
-    team1_name = game_momentum_df[game_momentum_df['momentum'] >= 0]['team'].iloc[0]  # Assuming positive momentum indicates Team 1
-    team2_name = game_momentum_df[game_momentum_df['momentum'] < 0]['team'].iloc[0]   # Assuming negative momentum indicates Team 2
-    
-    
-    # Text chart for Team 1 (positioned towards the top)
-    textChart_team1 = alt.Chart(pd.DataFrame({'time_minutes': [midpoint], 'pos': [0.8]})).mark_text(
-        align='center', baseline='middle'
-    ).encode(
-        x=alt.X('time_minutes:Q', axis=alt.Axis(title="Game Time (Minutes)")),
-        y='pos:Q',
-        text=alt.value(team1_name)  # Using the actual name of Team 1
-    )
-    
-    # Text chart for Team 2 (positioned towards the bottom)
-    textChart_team2 = alt.Chart(pd.DataFrame({'time_minutes': [midpoint], 'neg': [-0.8]})).mark_text(
-        align='center', baseline='middle'
-    ).encode(
-        x=alt.X('time_minutes:Q', axis=alt.Axis(title="Game Time (Minutes)")),
-        y='neg:Q',
-        text=alt.value(team2_name)  # Using the actual name of Team 2
-    )
-
-    return posChart_w + negChart_w + textChart_team1 + textChart_team2
-
-def display_game_statistics(game_data):
-    # Ensure there are two teams
-    teams = game_data['team_name'].unique()
-    if len(teams) != 2:
+        game_momentum = load_game_momentum(selected_game)
+        if game_momentum is None:
+            st.write("Momentum is not available for this game.")
+        else:
+            momentum_chart2 = create_momentum_chart(game_momentum)
+            st.altair_chart(momentum_chart2, use_container_width=True)
+
+
+def display_game_statistics(game_data, game_statistics=None):
+    if game_statistics is None:
+        game_statistics = compute_game_statistics(game_data)
+    if game_statistics is None:
         st.write("Error: There were not exactly two teams in the selected game data.")
         return
-    
-    # Aggregating action counts for each team
-    # Defining the actions of interest and their respective conditions
-    actions_conditions = {
-        'dribble': (game_data['type_name'] == 'dribble'),
-        'pass': (game_data['type_name'] == 'pass'),
-        'shot': (game_data['type_name'] == 'shot'),
-        'save': (game_data['type_name'] == 'save'),
-        'successful pass': ((game_data['type_name'] == 'pass') & (game_data['result_name'] == 'success')),
-        'goal': ((game_data['type_name'] == 'shot') & (game_data['result_name'] == 'success'))
-    }
-    
-    # Aggregating counts for each action
-    aggregated_data = pd.DataFrame()
-    for action_name, condition in actions_conditions.items():
-        action_data = game_data[condition].groupby('team_name').size().reset_index(name='Count')
-        action_data['type_name'] = action_name
-        aggregated_data = pd.concat([aggregated_data, action_data])
-    
-    # Pivoting the data for visualization
-    pivot_data = aggregated_data.pivot(index='type_name', columns='team_name', values='Count').reset_index()
-    pivot_data.columns.name = None
-    
-    # Renaming the columns to match the sample data structure
-    team_names = pivot_data.columns[1:]
-    pivot_data.rename(columns={team_names[0]: team_names[0], team_names[1]: team_names[1]}, inplace=True)
-    
-    # Melt the DataFrame to prepare the data
-    df_melted = pivot_data.melt(id_vars='type_name', var_name='Team', value_name='Count')
-    
-    # Calculate percentages
-    total_counts = df_melted.groupby('type_name')['Count'].transform('sum')
-    df_melted['Percentage'] = df_melted['Count'] / total_counts * 100
-
-    # Create the base chart
-    base = alt.Chart(df_melted).encode(
-        y=alt.Y('type_name:N', axis=alt.Axis(title='', labels=True), sort=df_melted['type_name'].unique().tolist()),
-        x=alt.X('sum(Percentage):Q', axis=alt.Axis(title='Percentage'), scale=alt.Scale(domain=[0, 100])),
-        color=alt.Color('Team:N', legend=alt.Legend(title="Team", orient = 'top')),
-        order=alt.Order('Team:N', sort='ascending')
-    )
-    
-    # Create the bar chart with labels
-    bars = base.mark_bar().encode(
-        tooltip=['type_name:N', 'Team:N', 'Percentage:Q']
-    )
-     
-    # Create labels using mark_text
-    labels = base.mark_text(
-        #align=alt.condition(alt.datum['Team'] == team_names[0], alt.value('right'), alt.value('left')),
-        align = 'center',
-        baseline='middle',  # Center the text vertically within the bars
-        dx = 0,
-        dy=0  # No vertical displacement
-    ).encode(
-        text=alt.Text('Count:Q', format=','),
-        color=alt.value('white'),  # Set the text content color to white
-        x='sum(Percentage):Q',  # Position the text at the starting point of the bars
-)
-
-
-   # Create labels for each team
-    labels_team1 = base.transform_filter(alt.datum['Team'] == teams[0]).mark_text(
-        align='left',
-        baseline='middle',
-        dx=5,
-    ).encode(
-        text=alt.Text('Count:Q', format=','),
-        color=alt.value('white'),
-        x=alt.value(0),  # Set x to 0 for Team 1
-    )
-    
-    labels_team2 = base.transform_filter(alt.datum['Team'] == teams[1]).mark_text(
-        align='right',
-        baseline='middle',
-        dx=200,
-    ).encode(
-        text=alt.Text('Count:Q', format=','),
-        color=alt.value('white'),
-        x=alt.value(100),  # Set x to 100 for Team 2
-    )
-    
-    # Layer the bar chart with text
-    chart = (bars + labels_team1 + labels_team2).properties(width=400, height=350)
 
-    
+    # Display the chart
+    st.altair_chart(create_game_statistics_chart(game_statistics))
 
-    # Layer the bar chart with text
-    #chart = (bars + labels).properties(width=600, height=200)
-    
-    
 
-    
-    
-    # Layer the bar chart with text
-    #chart = bars.properties(width=600, height=200)
-    #st.altair_chart(bars.properties(width=600, height=200))
+def display_possession_summary(game_possessions, game_data):
+    summary = possession_summary(game_possessions)
+    # No chains, or only zero-length ones, leave no possession share to show
+    if summary.empty or not np.isfinite(summary['possession_share']).all():
+        st.write("No possession data is available for this game.")
+        return
+    team_names = game_data.drop_duplicates('team_id').set_index('team_id')['team_name']
+    summary['team_name'] = summary['team_id'].map(team_names)
+
+    cols = st.columns(len(summary))
+    for col, row in zip(cols, summary.itertuples()):
+        col.metric(label=f"{row.team_name} Possession", value='{:.0%}'.format(row.possession_share))
+        col.caption(f"{row.possessions} possessions, {row.avg_actions:.1f} actions and {row.avg_progression:.1f} m progression on average")
 
-    # Display the chart
-    chart
-    
 
 def main2():
     #st.set_page_config(layout="wide")
@@ -506,14 +299,9 @@ def main2():
     st.write('##### *Grouped by Player Role*')
     st.write('\n')
 
-    playerank = pd.read_csv('playerank.csv')
-    #playerank
-
-    playerank_grouping = playerank.groupby('roleCluster').agg({'goalScored': 'sum', 'minutesPlayed': 'sum'}).reset_index()
-    playerank_grouping['minutes_per_goal'] = round(playerank_grouping['minutesPlayed'] / playerank_grouping['goalScored'], 1)
-    playerank_grouping['minutes_per_goal'] = playerank_grouping['minutes_per_goal'].replace([float('inf')], 0)
-
-    playerank_grouping = playerank_grouping[playerank_grouping['minutesPlayed'] >= 100000]
+    # Roles are aggregated inside the query layer; only the per-role totals come back
+    api = get_api_client()
+    playerank_grouping = api.role_totals(min_minutes=100000) if api else get_db().role_totals(min_minutes=100000)
 
     # creating a tri-plot viz that gives a little more clarity on the goals scored by each player role
     # and the goals per minutes ratio
@@ -558,6 +346,19 @@ def main2():
 
     combined_plot_2
 
+    st.write('## Where Does a Player Sit?')
+    st.write("Compare a single match performance against every player-match in the same role.")
+
+    role_sketches = load_role_sketches()
+    role_choice = st.selectbox('Choose a Player Role:', sorted(role_sketches['playerankScore']))
+    col1, col2, col3 = st.columns(3)
+    score = col1.number_input('Playerank Score', value=float(role_sketches['playerankScore'][role_choice].quantile(0.5)), format='%.4f')
+    minutes = col2.number_input('Minutes Played', min_value=0, max_value=130, value=90)
+    goals = col3.number_input('Goals Scored', min_value=0, max_value=10, value=0)
+    col1.metric(label="Playerank Percentile", value='{:.0f}%'.format(role_sketches['playerankScore'][role_choice].percentile(score)))
+    col2.metric(label="Minutes Percentile", value='{:.0f}%'.format(role_sketches['minutesPlayed'][role_choice].percentile(minutes)))
+    col3.metric(label="Goals Percentile", value='{:.0f}%'.format(role_sketches['goalScored'][role_choice].percentile(goals)))
+
     st.write('## Advanced Player Metrics')
 
     role_stats_2 = load_data('streamlit_stats_2.csv')
@@ -567,34 +368,53 @@ def main2():
     st.write('\n')
     #st.dataframe(role_stats_2)
     
-    for position in clean_positions:
-        if position_choice == position:
-            
-            #st.metric(label="Avg Overall", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'potential'].values[0])
-            st.write('##### *Monetary Value of This Position*')
-            col1, col2 = st.columns(2)
-            total_value = '€ {:,.0f}'.format(role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'value_eur'].values[0])
-            col1.metric(label="Total Value of Players (Euros)", value=total_value)
-            avg_wage = '€ {:,.2f}'.format(role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'wage_eur'].values[0])
-            col2.metric(label="Average Wage Per Player Per Game (Euros)", value=avg_wage)
-            
-            st.write('\n')
-            st.write('##### *Athletic Characteristics of This Position*')
-            col4, col5, col6 = st.columns(3)
-            col4.metric(label="Pace", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'pace'].values[0])
-            col5.metric(label="Shooting", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'shooting'].values[0])
-            col6.metric(label="Passing", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'passing'].values[0])
-            
-            col7, col8, col9 = st.columns(3)
-            col7.metric(label="Dribbling", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'dribbling'].values[0])
-            col8.metric(label="Defending", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'defending'].values[0])
-            col9.metric(label="Physic", value=role_stats_2.loc[role_stats_2['clean_position'] == position_choice, 'physic'].values[0])
-
-
-def create_momentum_comparison_chart(game_momentum_df, team_ids = [674]):
+    # One indexed lookup for the chosen position instead of a scan per metric
+    position_stats = role_stats_2.set_index('clean_position').loc[position_choice]
+
+    #st.metric(label="Avg Overall", value=position_stats['potential'])
+    st.write('##### *Monetary Value of This Position*')
+    col1, col2 = st.columns(2)
+    total_value = '€ {:,.0f}'.format(position_stats['value_eur'])
+    col1.metric(label="Total Value of Players (Euros)", value=total_value)
+    avg_wage = '€ {:,.2f}'.format(position_stats['wage_eur'])
+    col2.metric(label="Average Wage Per Player Per Game (Euros)", value=avg_wage)
+    
+    st.write('\n')
+    st.write('##### *Athletic Characteristics of This Position*')
+    col4, col5, col6 = st.columns(3)
+    col4.metric(label="Pace", value=position_stats['pace'])
+    col5.metric(label="Shooting", value=position_stats['shooting'])
+    col6.metric(label="Passing", value=position_stats['passing'])
+    
+    col7, col8, col9 = st.columns(3)
+    col7.metric(label="Dribbling", value=position_stats['dribbling'])
+    col8.metric(label="Defending", value=position_stats['defending'])
+    col9.metric(label="Physic", value=position_stats['physic'])
+
+
+def create_momentum_comparison_chart(game_momentum_df, team_ids = [674], time_range = None, max_points = MAX_CHART_POINTS):
 
     these_teams_momentum = game_momentum_df[game_momentum_df['team_id'].isin(team_ids)]
 
+    # With precomputed resolutions, send only as many points as the selected teams and time window need
+    if 'resolution' in these_teams_momentum.columns:
+        window_fraction = 1.0
+        if time_range is not None and len(these_teams_momentum) > 0:
+            full_span = these_teams_momentum['time_minutes'].max() - these_teams_momentum['time_minutes'].min()
+            window_fraction = (time_range[1] - time_range[0]) / full_span if full_span > 0 else 1.0
+        # The longest full-resolution series decides whether the full data fits the budget
+        full_series = these_teams_momentum[these_teams_momentum['resolution'] == 0]
+        series_cols = ['team_id', 'season'] if 'season' in full_series.columns else ['team_id']
+        series_length = full_series.groupby(series_cols).size().max() if len(full_series) else 0
+        resolution = pick_resolution(len(team_ids), window_fraction, max_points, series_length=series_length)
+        # Series shorter than the chosen level have no copy of it, so they are drawn at full resolution
+        finest_level = these_teams_momentum.groupby(series_cols)['resolution'].transform('max')
+        these_teams_momentum = these_teams_momentum[(these_teams_momentum['resolution'] == resolution)
+                                                    | ((finest_level < resolution) & (these_teams_momentum['resolution'] == 0))]
+
+    if time_range is not None:
+        these_teams_momentum = these_teams_momentum[these_teams_momentum['time_minutes'].between(*time_range)]
+
     chart = alt.Chart(these_teams_momentum).mark_line().encode(
         x=alt.X("time_minutes", title="Minute"),
         y=alt.Y("weighted_avg_momentum:Q", title="Momentum", scale=alt.Scale(domain=[-.25, .25])),
@@ -612,7 +432,8 @@ def make_team_comparison_bar_chart(team_metrics_df, metric, multi, height=200):
     text= base_bar.mark_text(angle = 270, align="center", yOffset=50, fontWeight="bold").encode(text="name:N", color=alt.ColorValue("black"))
     return (base_bar + text)
 
-def create_team_comparison_charts(team_metrics_df, team_metrics, league = 'All'):
+# subset_metrics_df is expected to hold only the clubs of the selected league (see TeamLookup.league_team_ids)
+def create_team_comparison_charts(subset_metrics_df, team_metrics, league = 'All'):
     # Europe: center = [-20, 47], scale = 1400
     # France: center = [-20, 47], scale = 3000)
     # England: center = [-22, 52], scale = 4200)
@@ -620,27 +441,21 @@ def create_team_comparison_charts(team_metrics_df, team_metrics, league = 'All')
     # Spain: center = [-25, 40], scale = 3200)
     # Italy: center = [-8, 42], scale = 3200)
     if league == 'England':
-      subset_metrics_df = team_metrics_df[team_metrics_df['Country'] == 'England']
       center = [-22, 52]
       scale = 4200
     elif league == 'France':
-      subset_metrics_df = team_metrics_df[team_metrics_df['Country'].isin(['France','Monaco'])]
       center = [-20, 47]
       scale = 3000
     elif league == 'Germany':
-      subset_metrics_df = team_metrics_df[team_metrics_df['Country'] == 'Germany']
       center = [-10, 52]
       scale = 3700
     elif league == 'Spain':
-      subset_metrics_df = team_metrics_df[team_metrics_df['Country'] == 'Spain']
       center = [-25, 40]
       scale = 3200
     elif league == 'Italy':
-      subset_metrics_df = team_metrics_df[team_metrics_df['Country'] == 'Italy']
       center = [-8, 42]
       scale = 3200    
     else:
-      subset_metrics_df = team_metrics_df
       center = [-20, 47]
       scale = 1400 
     
@@ -703,40 +518,84 @@ def create_team_comparison_charts(team_metrics_df, team_metrics, league = 'All')
     return alt.vconcat((geo_chart + geo_points), (barChart1 | barChart2 | barChart3), center=True)
     
 def main3():
-    team_season_momentum = load_data('team_season_momentum.csv')
-    team_metrics_df = load_data('team_metrics1.csv')
+    db = get_db()
+    teams = load_teams()
+    team_metrics_df = db.team_metrics(columns=['team_id'])
     
     tab1, tab2 = st.tabs(["Momentum", "Metrics"])
     
     with tab1:
         st.header('Club Average Momentum')
         st.caption('Momentum estimates how well a club is doing at any point in the game. This chart has been averaged across the full season to identify trends in performance.')
-        selected_teams = st.multiselect('Choose Teams', team_metrics_df["team_id"], max_selections = 5, format_func=lambda x: team_metrics_df[team_metrics_df['team_id']==x]['name'].values[0])
+        selected_teams = st.multiselect('Choose Teams', team_metrics_df["team_id"], max_selections = 5, format_func=teams.name)
+        momentum_resolutions = load_momentum_resolutions()
+        last_minute = int(momentum_resolutions['time_minutes'].max())
+        time_range = st.slider('Game Time (Minutes)', 0, last_minute, (0, last_minute))
     
-        st.altair_chart(create_momentum_comparison_chart(team_season_momentum, selected_teams), use_container_width=True)
+        st.altair_chart(create_momentum_comparison_chart(momentum_resolutions, selected_teams, time_range), use_container_width=True)
     
     with tab2:
         st.header('Club Metric Comparisons')
         selectedLeague = st.selectbox("League", ['All', 'England', 'France', 'Germany', 'Italy', 'Spain'])
         team_metrics = ["Pass Success Rate", "Crosses / Shot", "Passes / Shot"]
 
-        st.altair_chart(create_team_comparison_charts(team_metrics_df, team_metrics, selectedLeague), use_container_width=True)
+        league_metrics_df = db.team_metrics(teams.league_team_ids(selectedLeague))
+        league_metrics_df['name'] = league_metrics_df['team_id'].map(teams.name)
+        st.altair_chart(create_team_comparison_charts(league_metrics_df, team_metrics, selectedLeague), use_container_width=True)
     
 
+# Function to embed the Tableau valuation dashboards
+def display_tableau_valuations():
+    st.write("### Average Player Valuation by Geographical Region")
+    st.caption('Average player valuations vary across geographical regions. Select a region and average value filter to customize average valuation trends.')
+    html_temp = "<div class='tableauPlaceholder' id='viz1702124510386' style='position: relative'><noscript><a href='#'><img alt=' ' src='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;YH&#47;YHN9655BK&#47;1_rss.png' style='border: none' /></a></noscript><object class='tableauViz'  style='display:none;'><param name='host_url' value='https%3A%2F%2Fpublic.tableau.com%2F' /> <param name='embed_code_version' value='3' /> <param name='path' value='shared&#47;YHN9655BK' /> <param name='toolbar' value='yes' /><param name='static_image' value='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;YH&#47;YHN9655BK&#47;1.png' /> <param name='animate_transition' value='yes' /><param name='display_static_image' value='yes' /><param name='display_spinner' value='yes' /><param name='display_overlay' value='yes' /><param name='display_count' value='yes' /><param name='language' value='en-US' /></object></div>                <script type='text/javascript'>                    var divElement = document.getElementById('viz1702124510386');                    var vizElement = divElement.getElementsByTagName('object')[0];                    vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';                    var scriptElement = document.createElement('script');                    scriptElement.src = 'https://public.tableau.com/javascripts/api/viz_v1.js';                    vizElement.parentNode.insertBefore(scriptElement, vizElement);                </script>"
+    components.html(html_temp, width=900, height=650)
+
+    st.write("### Player Valuation Lookup")
+    st.caption('Customize player lookup view by selecting player, region, and team filters below. Select a player name to analyze counts of successful actions and player characteristics.')
+    html_temp = "<div class='tableauPlaceholder' id='viz1702242714672' style='position: relative'><noscript><a href='#'><img alt=' ' src='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;FP&#47;FP_Player_Valuations&#47;PlayerLookupDashboard&#47;1_rss.png' style='border: none' /></a></noscript><object class='tableauViz'  style='display:none;'><param name='host_url' value='https%3A%2F%2Fpublic.tableau.com%2F' /> <param name='embed_code_version' value='3' /> <param name='site_root' value='' /><param name='name' value='FP_Player_Valuations&#47;PlayerLookupDashboard' /><param name='tabs' value='yes' /><param name='toolbar' value='yes' /><param name='static_image' value='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;FP&#47;FP_Player_Valuations&#47;PlayerLookupDashboard&#47;1.png' /> <param name='animate_transition' value='yes' /><param name='display_static_image' value='yes' /><param name='display_spinner' value='yes' /><param name='display_overlay' value='yes' /><param name='display_count' value='yes' /><param name='language' value='en-US' /><param name='filter' value='publish=yes' /></object></div>                <script type='text/javascript'>                    var divElement = document.getElementById('viz1702242714672');                    var vizElement = divElement.getElementsByTagName('object')[0];                    if ( divElement.offsetWidth > 800 ) { vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';} else if ( divElement.offsetWidth > 500 ) { vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';} else { vizElement.style.width='100%';vizElement.style.minHeight='950px';vizElement.style.maxHeight=(divElement.offsetWidth*1.77)+'px';}                     var scriptElement = document.createElement('script');                    scriptElement.src = 'https://public.tableau.com/javascripts/api/viz_v1.js';                    vizElement.parentNode.insertBefore(scriptElement, vizElement);                </script>"
+    components.html(html_temp, width=900, height=700)
+
+
 def main5():
     st.write("# Player Valuations")
 
     st.write("Player valuations can often vary by a significant magnitude, likely driven by factors including player performance, nationality, and physical characteristics. We are interested in analyzing these specific factors to identify trends that may help us understand why the current top players are valued the way they are, and to spot rising talent that may not be fairly valued under existing market standards.")
 
+    # Without the per-player export, fall back to the published Tableau dashboards
+    if not os.path.exists(PLAYERS_PATH):
+        display_tableau_valuations()
+        return
+    valuations = load_valuations()
+
     st.write("### Average Player Valuation by Geographical Region")
     st.caption('Average player valuations vary across geographical regions. Select a region and average value filter to customize average valuation trends.')
-    html_temp = "<div class='tableauPlaceholder' id='viz1702124510386' style='position: relative'><noscript><a href='#'><img alt=' ' src='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;YH&#47;YHN9655BK&#47;1_rss.png' style='border: none' /></a></noscript><object class='tableauViz'  style='display:none;'><param name='host_url' value='https%3A%2F%2Fpublic.tableau.com%2F' /> <param name='embed_code_version' value='3' /> <param name='path' value='shared&#47;YHN9655BK' /> <param name='toolbar' value='yes' /><param name='static_image' value='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;YH&#47;YHN9655BK&#47;1.png' /> <param name='animate_transition' value='yes' /><param name='display_static_image' value='yes' /><param name='display_spinner' value='yes' /><param name='display_overlay' value='yes' /><param name='display_count' value='yes' /><param name='language' value='en-US' /></object></div>                <script type='text/javascript'>                    var divElement = document.getElementById('viz1702124510386');                    var vizElement = divElement.getElementsByTagName('object')[0];                    vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';                    var scriptElement = document.createElement('script');                    scriptElement.src = 'https://public.tableau.com/javascripts/api/viz_v1.js';                    vizElement.parentNode.insertBefore(scriptElement, vizElement);                </script>"
-    components.html(html_temp, width=900, height=650)
+    col1, col2 = st.columns(2)
+    selected_regions = col1.multiselect('Region', valuations.regions, default=valuations.regions)
+    st.altair_chart(create_region_average_chart(valuations.region_valuations(selected_regions)), use_container_width=True)
+    max_avg_value = int(valuations.by_nation['avg_value_eur'].max())
+    min_avg_value = col2.slider('Minimum Average Value (Euros)', 0, max_avg_value, 0, step=max(max_avg_value // 100, 1))
+    st.altair_chart(create_region_valuation_chart(valuations.nation_valuations(selected_regions, min_avg_value)), use_container_width=True)
 
     st.write("### Player Valuation Lookup")
     st.caption('Customize player lookup view by selecting player, region, and team filters below. Select a player name to analyze counts of successful actions and player characteristics.')
-    html_temp = "<div class='tableauPlaceholder' id='viz1702242714672' style='position: relative'><noscript><a href='#'><img alt=' ' src='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;FP&#47;FP_Player_Valuations&#47;PlayerLookupDashboard&#47;1_rss.png' style='border: none' /></a></noscript><object class='tableauViz'  style='display:none;'><param name='host_url' value='https%3A%2F%2Fpublic.tableau.com%2F' /> <param name='embed_code_version' value='3' /> <param name='site_root' value='' /><param name='name' value='FP_Player_Valuations&#47;PlayerLookupDashboard' /><param name='tabs' value='yes' /><param name='toolbar' value='yes' /><param name='static_image' value='https:&#47;&#47;public.tableau.com&#47;static&#47;images&#47;FP&#47;FP_Player_Valuations&#47;PlayerLookupDashboard&#47;1.png' /> <param name='animate_transition' value='yes' /><param name='display_static_image' value='yes' /><param name='display_spinner' value='yes' /><param name='display_overlay' value='yes' /><param name='display_count' value='yes' /><param name='language' value='en-US' /><param name='filter' value='publish=yes' /></object></div>                <script type='text/javascript'>                    var divElement = document.getElementById('viz1702242714672');                    var vizElement = divElement.getElementsByTagName('object')[0];                    if ( divElement.offsetWidth > 800 ) { vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';} else if ( divElement.offsetWidth > 500 ) { vizElement.style.width='100%';vizElement.style.height=(divElement.offsetWidth*0.75)+'px';} else { vizElement.style.width='100%';vizElement.style.minHeight='950px';vizElement.style.maxHeight=(divElement.offsetWidth*1.77)+'px';}                     var scriptElement = document.createElement('script');                    scriptElement.src = 'https://public.tableau.com/javascripts/api/viz_v1.js';                    vizElement.parentNode.insertBefore(scriptElement, vizElement);                </script>"
-    components.html(html_temp, width=900, height=700)
+    col1, col2, col3 = st.columns(3)
+    search_text = col1.text_input('Player Name')
+    region = col2.selectbox('Region', ['All'] + valuations.regions, key='lookup_region')
+    club = col3.selectbox('Team', ['All'] + valuations.clubs)
+    matches = valuations.search(search_text, region, club)
+    if matches.empty:
+        st.write("No players match these filters.")
+        return
+
+    player_index = st.selectbox('Select a player', matches.index, format_func=lambda i: f"{matches.at[i, 'display_name']} ({matches.at[i, 'club']})")
+    player = matches.loc[player_index]
+    col4, col5, col6, col7 = st.columns(4)
+    col4.metric(label="Value (Euros)", value='€ {:,.0f}'.format(player['value_eur']))
+    col5.metric(label="Wage (Euros)", value='€ {:,.0f}'.format(player['wage_eur']))
+    col6.metric(label="Overall", value=player['overall'])
+    col7.metric(label="Potential", value=player['potential'])
+    st.altair_chart(create_player_attribute_chart(player), use_container_width=True)
 
 
 def main4():
@@ -791,6 +650,8 @@ def main4():
 def main():
     st.set_page_config(page_title="KickLogic", page_icon=":soccer:", layout = "centered")
     st.title('KickLogic - Soccer Analytics')
+    # Start the prefetcher on the first run so the most viewed games are warm before anyone opens Match Analysis
+    get_prefetcher()
     app_choice_2 = st.selectbox('Choose Page to Navigate To:', ['Home', 'Player Role Analysis', 'Match Analysis', 'Player Valuation Analysis', 'Club Analysis'])
     if app_choice_2 == 'Player Role Analysis':
         main2()
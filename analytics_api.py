@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+from match_analysis import calc_game_momentum, compute_game_statistics
+from query_layer import KickLogicDB
+from team_dimension import build_team_dimension, TeamLookup
+
+
+# Read-only HTTP API over the KickLogic datasets. It is a plain ASGI app, so
+# the datasets are loaded once per server process and shared by every
+# frontend instead of being recomputed in each Streamlit script run.
+# Responses are cached in memory and carry ETags so clients can revalidate
+# with If-None-Match and get an empty 304 back.
+#
+# Run with: uvicorn analytics_api:app --port 8502
+# Set KICKLOGIC_DATA_DIR to serve datasets from another directory.
+
+CACHE_SIZE = 512
+CACHE_CONTROL = 'public, max-age=300'
+
+PASS_COLUMNS = ['player_name', 'time_seconds', 'period_id', 'start_x', 'start_y', 'end_x', 'end_y', 'result_name']
+SHOT_COLUMNS = ['player_name', 'time_minutes', 'start_x', 'start_y', 'result_name']
+
+
+class ResponseCache:
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class AnalyticsService:
+
+    def __init__(self, data_dir='.'):
+        self.db = KickLogicDB(data_dir)
+        self.teams = TeamLookup(build_team_dimension(pd.read_csv(os.path.join(data_dir, 'teams_enriched.csv'))))
+        self.routes = [
+            (re.compile(r'^/health$'), self.health),
+            (re.compile(r'^/matches/(\d+)/stats$'), self.match_stats),
+            (re.compile(r'^/matches/(\d+)/momentum$'), self.match_momentum),
+            (re.compile(r'^/matches/(\d+)/passes$'), self.match_passes),
+            (re.compile(r'^/matches/(\d+)/shots$'), self.match_shots),
+            (re.compile(r'^/roles$'), self.roles),
+            (re.compile(r'^/teams/metrics$'), self.team_metrics),
+            (re.compile(r'^/teams/momentum$'), self.team_momentum),
+        ]
+
+    def health(self, query):
+        return {'status': 'ok', 'tables': self.db.tables}
+
+    def match_stats(self, query, game_id):
+        return compute_game_statistics(self.db.game_actions(game_id, ['team_name', 'type_name', 'result_name']))
+
+    def match_momentum(self, query, game_id):
+        return calc_game_momentum(self.db.game_actions(game_id), int(game_id))
+
+    def match_passes(self, query, game_id):
+        return self.team_actions(game_id, query, 'pass', PASS_COLUMNS)
+
+    def match_shots(self, query, game_id):
+        return self.team_actions(game_id, query, 'shot', SHOT_COLUMNS)
+
+    # Function to get one game's actions of a type; None (404) for a game with no actions, like stats and momentum
+    def team_actions(self, game_id, query, type_name, columns):
+        actions = self.db.game_actions(game_id, ['team_id', 'type_name'] + columns)
+        if actions.empty:
+            return None
+        actions = actions[actions['type_name'] == type_name]
+        if 'team_id' in query:
+            actions = actions[actions['team_id'] == int(query['team_id'][0])]
+        return actions
+
+    def roles(self, query):
+        return self.db.role_totals(int(query.get('min_minutes', [0])[0]))
+
+    def team_metrics(self, query):
+        if 'team_id' in query:
+            team_ids = query['team_id']
+        else:
+            team_ids = self.teams.league_team_ids(query.get('league', ['All'])[0])
+        metrics = self.db.team_metrics(team_ids)
+        metrics['name'] = metrics['team_id'].map(self.teams.name)
+        return metrics
+
+    def team_momentum(self, query):
+        momentum = self.db.season_momentum(query.get('team_id', []))
+        momentum['name'] = momentum['team_id'].map(self.teams.name)
+        return momentum
+
+    # Function to route a request and serialise the result; returns (status, body)
+    def handle(self, path, query):
+        for pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                result = handler(query, *match.groups())
+                if result is None:
+                    return 404, json.dumps({'error': 'no data for this request'}).encode()
+                if isinstance(result, pd.DataFrame):
+                    return 200, result.to_json(orient='records').encode()
+                return 200, json.dumps(result).encode()
+        return 404, json.dumps({'error': f'unknown endpoint {path}'}).encode()
+
+
+class AnalyticsApp:
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or os.environ.get('KICKLOGIC_DATA_DIR', '.')
+        self.service = None
+        self.service_lock = asyncio.Lock()
+        self.cache = ResponseCache()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['method'] not in ('GET', 'HEAD'):
+            await self.respond(send, 405, b'{"error": "read-only API"}', {})
+            return
+
+        # Servers without lifespan support load the datasets on the first request
+        if self.service is None:
+            await self.start_service()
+
+        query_string = scope['query_string'].decode()
+        cache_key = scope['path'] + '?' + query_string
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            query = parse_qs(query_string)
+            try:
+                # Queries and pandas work run off the event loop so requests overlap
+                status, body = await asyncio.to_thread(self.service.handle, scope['path'], query)
+            except (ValueError, KeyError) as e:
+                status, body = 400, json.dumps({'error': str(e)}).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            cached = (status, body, etag)
+            # The datasets are read-only, so missing games stay missing too
+            if status in (200, 404):
+                self.cache.put(cache_key, cached)
+
+        status, body, etag = cached
+        request_headers = dict(scope['headers'])
+        if status == 200 and request_headers.get(b'if-none-match', b'').decode() == etag:
+            await self.respond(send, 304, b'', {'etag': etag})
+            return
+        if scope['method'] == 'HEAD':
+            body = b''
+        await self.respond(send, status, body, {'etag': etag})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.start_service()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # Function to load the datasets once, even when several first requests arrive together
+    async def start_service(self):
+        async with self.service_lock:
+            if self.service is None:
+                self.service = await asyncio.to_thread(AnalyticsService, self.data_dir)
+
+    async def respond(self, send, status, body, headers):
+        response_headers = [(b'content-type', b'application/json'), (b'cache-control', CACHE_CONTROL.encode())]
+        response_headers += [(name.encode(), value.encode()) for name, value in headers.items()]
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = AnalyticsApp()
@@ -0,0 +1,67 @@
+import io
+import threading
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Client for analytics_api.py. One pooled keep-alive session is shared by all
+# Streamlit sessions; responses are kept with their ETags so repeat requests
+# are revalidated with If-None-Match and a 304 reuses the cached body.
+
+
+class KickLogicClient:
+
+    def __init__(self, base_url, pool_size=16, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.etag_cache = {}
+        self.lock = threading.Lock()
+
+    # Function to GET an endpoint and return the raw JSON text (None on 404)
+    def get(self, path, params=None):
+        request = requests.Request('GET', self.base_url + path, params=params).prepare()
+        with self.lock:
+            cached = self.etag_cache.get(request.url)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+
+        response = self.session.get(request.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        if 'ETag' in response.headers:
+            with self.lock:
+                self.etag_cache[request.url] = (response.headers['ETag'], response.text)
+        return response.text
+
+    def get_frame(self, path, params=None):
+        text = self.get(path, params)
+        return None if text is None else pd.read_json(io.StringIO(text), orient='records')
+
+    def match_statistics(self, game_id):
+        return self.get_frame(f'/matches/{int(game_id)}/stats')
+
+    def match_momentum(self, game_id):
+        return self.get_frame(f'/matches/{int(game_id)}/momentum')
+
+    def match_passes(self, game_id, team_id=None):
+        return self.get_frame(f'/matches/{int(game_id)}/passes', {'team_id': team_id} if team_id is not None else None)
+
+    def match_shots(self, game_id, team_id=None):
+        return self.get_frame(f'/matches/{int(game_id)}/shots', {'team_id': team_id} if team_id is not None else None)
+
+    def role_totals(self, min_minutes=0):
+        return self.get_frame('/roles', {'min_minutes': min_minutes})
+
+    def team_metrics(self, league='All'):
+        return self.get_frame('/teams/metrics', {'league': league})
+
+    def team_momentum(self, team_ids):
+        return self.get_frame('/teams/momentum', {'team_id': list(team_ids)})
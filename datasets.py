@@ -0,0 +1,57 @@
+import os
+
+import duckdb
+
+
+# The KickLogic dataset files and their Parquet copies. validation.py writes
+# the Parquet files (validated tables, plus straight conversions of the rest)
+# and query_layer.py reads them; both build on this module.
+#
+# Ingest is an explicit step: python validation.py [data_dir]
+
+TABLES = {
+    'actions': 'enriched_actions_prem',
+    'playerank': 'playerank',
+    'matches': 'match_details',
+    'teams': 'team_metrics1',
+    'momentum': 'team_season_momentum',
+    # Rows rejected by validation.py; these only exist as Parquet
+    'actions_quarantine': 'enriched_actions_prem_quarantine',
+    'playerank_quarantine': 'playerank_quarantine',
+}
+
+# Tables that are only ever read from the cleaned Parquet files validation.py writes
+VALIDATED_TABLES = ['actions', 'playerank']
+
+
+# Function to write a query's result to Parquet, renaming it into place so readers never open a partial file
+def copy_to_parquet(con, sql, parquet_path):
+    tmp_path = f'{parquet_path}.{os.getpid()}.tmp'
+    con.execute(f"COPY ({sql}) TO '{tmp_path}' (FORMAT PARQUET)")
+    os.replace(tmp_path, parquet_path)
+
+
+# Function to convert the CSV datasets to Parquet so queries get filter pushdown and column pruning
+def export_parquet(data_dir='.', file_names=None):
+    con = duckdb.connect()
+    for file_name in file_names or TABLES.values():
+        csv_path = os.path.join(data_dir, file_name + '.csv')
+        if os.path.exists(csv_path):
+            copy_to_parquet(con, f"SELECT * FROM read_csv_auto('{csv_path}')", os.path.join(data_dir, file_name + '.parquet'))
+    con.close()
+
+
+# Function to list the tables whose Parquet file is missing (validated tables) or older than its CSV
+def stale_tables(data_dir='.'):
+    stale = []
+    for table, file_name in TABLES.items():
+        csv_path = os.path.join(data_dir, file_name + '.csv')
+        parquet_path = os.path.join(data_dir, file_name + '.parquet')
+        if not os.path.exists(csv_path):
+            continue
+        if os.path.exists(parquet_path):
+            if os.path.getmtime(csv_path) > os.path.getmtime(parquet_path):
+                stale.append(table)
+        elif table in VALIDATED_TABLES:
+            stale.append(table)
+    return stale
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+# Largest-triangle-three-buckets (LTTB) downsampling for the momentum
+# comparison chart. Each team (and season, when the table has one) is reduced
+# once to several fixed point budgets; the chart then picks the smallest
+# budget that still gives every selected line enough points for the visible
+# time window, so the browser never receives more than MAX_CHART_POINTS.
+
+MOMENTUM_RESOLUTIONS = [25, 50, 100, 200, 400, 800]
+
+MAX_CHART_POINTS = 1000
+
+
+# Function to pick the indices of n_out points that keep the visual shape of y over x
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[edges[i + 1]:edges[i + 2]].mean()
+            next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's average
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+# Function to precompute every resolution of every series in a long-format table
+def build_resolutions(df, x='time_minutes', y='weighted_avg_momentum', series_cols=None, resolutions=None):
+    if series_cols is None:
+        series_cols = ['team_id', 'season'] if 'season' in df.columns else ['team_id']
+    resolutions = resolutions or MOMENTUM_RESOLUTIONS
+
+    levels = []
+    for _, series in df.sort_values(series_cols + [x]).groupby(series_cols, sort=False):
+        x_values = series[x].to_numpy()
+        y_values = series[y].to_numpy()
+        # Levels at or above the series length would only copy it; pick_resolution falls back to 0 for those
+        for resolution in resolutions:
+            if resolution < len(series):
+                levels.append(series.iloc[lttb(x_values, y_values, resolution)].assign(resolution=resolution))
+        # resolution 0 holds the full-resolution series
+        levels.append(series.assign(resolution=0))
+
+    return pd.concat(levels, ignore_index=True)
+
+
+# Function to choose the finest resolution that keeps the visible window within the point budget (0 is the full series)
+def pick_resolution(n_series, window_fraction=1.0, max_points=MAX_CHART_POINTS, resolutions=None, series_length=None):
+    resolutions = sorted(resolutions or MOMENTUM_RESOLUTIONS)
+    if n_series == 0:
+        return resolutions[0]
+    # Points per series the budget allows on screen, scaled up to the whole series when zoomed in
+    needed = max_points / n_series / max(window_fraction, 1e-9)
+    if series_length is not None and series_length <= needed:
+        return 0
+    fitting = [r for r in resolutions if r <= needed]
+    return fitting[-1] if fitting else resolutions[0]
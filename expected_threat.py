@@ -0,0 +1,126 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Expected threat (xT): the probability that possession in a pitch cell ends
+# in a goal within the next few actions. Fit by value iteration over a grid
+# on the same 105 x 68 coordinate system used by the pass and shot maps.
+
+XT_MODEL_VERSION = 1
+
+FIELD_LENGTH = 105.0
+FIELD_WIDTH = 68.0
+
+MOVE_ACTIONS = ['pass', 'cross', 'dribble', 'take_on', 'throw_in', 'freekick_short',
+                'freekick_crossed', 'corner_short', 'corner_crossed', 'goalkick']
+SHOT_ACTIONS = ['shot', 'shot_freekick', 'shot_penalty']
+
+# Actions that are scored with xT-added
+SCORED_ACTIONS = ['pass', 'cross', 'dribble', 'take_on']
+
+# Action columns fit_xt reads
+XT_COLUMNS = ['type_name', 'result_name', 'start_x', 'start_y', 'end_x', 'end_y']
+
+
+# Function to map pitch coordinates to flat grid cell indices
+def cell_index(x, y, length=16, width=12):
+    x_bin = np.clip((np.asarray(x, dtype=np.float64) / FIELD_LENGTH * length).astype(np.int64), 0, length - 1)
+    y_bin = np.clip((np.asarray(y, dtype=np.float64) / FIELD_WIDTH * width).astype(np.int64), 0, width - 1)
+    return y_bin * length + x_bin
+
+
+# Function to fit the xT grid from move and shot actions
+def fit_xt(actions, length=16, width=12, eps=1e-5, max_iter=100):
+    n_cells = length * width
+    type_names = actions['type_name'].to_numpy()
+    success = actions['result_name'].to_numpy() == 'success'
+    start_cells = cell_index(actions['start_x'], actions['start_y'], length, width)
+    end_cells = cell_index(actions['end_x'], actions['end_y'], length, width)
+
+    is_move = np.isin(type_names, MOVE_ACTIONS)
+    is_shot = np.isin(type_names, SHOT_ACTIONS)
+
+    move_counts = np.bincount(start_cells[is_move], minlength=n_cells).astype(np.float64)
+    shot_counts = np.bincount(start_cells[is_shot], minlength=n_cells).astype(np.float64)
+    goal_counts = np.bincount(start_cells[is_shot & success], minlength=n_cells).astype(np.float64)
+    totals = move_counts + shot_counts
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shot_prob = np.where(totals > 0, shot_counts / totals, 0.0)
+        move_prob = np.where(totals > 0, move_counts / totals, 0.0)
+        goal_prob = np.where(shot_counts > 0, goal_counts / shot_counts, 0.0)
+
+    # Transition matrix of successful moves from start cell to end cell,
+    # normalised by all moves out of the start cell so failed moves lose value
+    successful_moves = is_move & success
+    transitions = np.bincount(
+        start_cells[successful_moves] * n_cells + end_cells[successful_moves],
+        minlength=n_cells * n_cells,
+    ).reshape(n_cells, n_cells).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        transitions = np.where(move_counts[:, None] > 0, transitions / move_counts[:, None], 0.0)
+
+    # Value iteration: xT = P(shot) * P(goal) + P(move) * T @ xT
+    shoot_value = shot_prob * goal_prob
+    xt = np.zeros(n_cells)
+    for _ in range(max_iter):
+        new_xt = shoot_value + move_prob * (transitions @ xt)
+        converged = np.abs(new_xt - xt).max() < eps
+        xt = new_xt
+        if converged:
+            break
+
+    return xt.reshape(width, length)
+
+
+# Function to save a fitted grid with its version so stale models are not reused
+def save_xt_model(path, xt_grid):
+    np.savez_compressed(path, xt=xt_grid, version=XT_MODEL_VERSION)
+
+
+# Function to load a saved grid, rejecting models written by another version
+def load_xt_model(path):
+    with np.load(path) as model:
+        version = int(model['version'])
+        if version != XT_MODEL_VERSION:
+            raise ValueError(f"xT model {path} is version {version}, expected {XT_MODEL_VERSION}; refit it with expected_threat.py")
+        return model['xt']
+
+
+# Function to load a saved grid, or fit and save a new one when it is missing or outdated
+# (load_actions is only called when a fit is needed)
+def load_or_fit_xt(path, load_actions):
+    if os.path.exists(path):
+        try:
+            return load_xt_model(path)
+        except ValueError as e:
+            print(f"Refitting xT model: {e}")
+    xt_grid = fit_xt(load_actions())
+    save_xt_model(path, xt_grid)
+    return xt_grid
+
+
+# Function to score xT-added for every action in a batch (0 for unscored or failed actions)
+def rate_actions(actions, xt_grid):
+    width, length = xt_grid.shape
+    flat_xt = xt_grid.ravel()
+    start_cells = cell_index(actions['start_x'], actions['start_y'], length, width)
+    end_cells = cell_index(actions['end_x'], actions['end_y'], length, width)
+
+    scored = (actions['type_name'].isin(SCORED_ACTIONS) & (actions['result_name'] == 'success')).to_numpy()
+    xt_added = np.where(scored, flat_xt[end_cells] - flat_xt[start_cells], 0.0)
+
+    return pd.Series(xt_added, index=actions.index, name='xt_added')
+
+
+if __name__ == '__main__':
+    # Usage: python expected_threat.py <actions.csv> <model.npz> [length width]
+    actions_path, model_path = sys.argv[1], sys.argv[2]
+    grid_length, grid_width = (int(v) for v in sys.argv[3:5]) if len(sys.argv) > 4 else (16, 12)
+
+    actions = pd.read_csv(actions_path, usecols=XT_COLUMNS)
+    save_xt_model(model_path, fit_xt(actions, grid_length, grid_width))
+    print(f"Saved {grid_length}x{grid_width} xT model fit on {len(actions):,} actions to {model_path}")
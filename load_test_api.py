@@ -0,0 +1,78 @@
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+import requests
+
+
+# Load test for a local analytics_api.py instance. Each thread keeps its own
+# keep-alive session and replays a mix of match, role and club requests.
+#
+# Usage: python load_test_api.py [--url http://127.0.0.1:8502] [--threads 8] [--duration 20] [--etags]
+
+
+def request_mix(game_ids, team_ids):
+    game_id = random.choice(game_ids)
+    team_id = random.choice(team_ids)
+    return random.choice([
+        f'/matches/{game_id}/stats',
+        f'/matches/{game_id}/momentum',
+        f'/matches/{game_id}/passes',
+        f'/matches/{game_id}/shots',
+        '/roles?min_minutes=100000',
+        '/teams/metrics?league=' + random.choice(['All', 'England', 'France', 'Germany', 'Italy', 'Spain']),
+        f'/teams/momentum?team_id={team_id}',
+    ])
+
+
+def worker(url, game_ids, team_ids, deadline, use_etags, latencies, statuses):
+    session = requests.Session()
+    etags = {}
+    while time.perf_counter() < deadline:
+        path = request_mix(game_ids, team_ids)
+        headers = {'If-None-Match': etags[path]} if use_etags and path in etags else {}
+        start = time.perf_counter()
+        response = session.get(url + path, headers=headers, timeout=30)
+        latencies.append(time.perf_counter() - start)
+        statuses.append(response.status_code)
+        if 'ETag' in response.headers:
+            etags[path] = response.headers['ETag']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure requests per second and latency of the analytics API')
+    parser.add_argument('--url', default='http://127.0.0.1:8502')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--etags', action='store_true', help='revalidate repeat requests with If-None-Match')
+    args = parser.parse_args()
+
+    # Sample real ids from the server so every request hits data
+    teams = requests.get(args.url + '/teams/metrics', timeout=30).json()
+    team_ids = [team['team_id'] for team in teams]
+    with open('match_details.csv') as f:
+        game_ids = [int(float(line.split(',')[0])) for line in f.readlines()[1:]]
+
+    latencies, statuses = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=worker, args=(args.url, game_ids, team_ids, deadline, args.etags, latencies, statuses))
+               for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    status_counts = {status: statuses.count(status) for status in sorted(set(statuses))}
+    print(f"{len(latencies)} requests in {elapsed:.1f}s with {args.threads} threads")
+    print(f"Requests per second: {len(latencies) / elapsed:.1f}")
+    print(f"Latency p50: {np.percentile(latencies_ms, 50):.1f} ms, p95: {np.percentile(latencies_ms, 95):.1f} ms, max: {latencies_ms.max():.1f} ms")
+    print(f"Status codes: {status_counts}")
+
+
+if __name__ == '__main__':
+    main()
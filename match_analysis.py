@@ -0,0 +1,377 @@
+import math
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+
+# Match-level computations and the Altair chart builders behind the Match
+# Analysis page. Kept free of Streamlit so the analytics API and the
+# pre-render batch can import them without the app.
+
+# Function to create a passing map
+def calculate_angle(row):
+    start_x, start_y = row['start_x'], row['start_y']
+    end_x, end_y = row['end_x'], row['end_y']
+
+    # Calculate the angle in radians
+    angle_rad = math.atan2(end_y - start_y, end_x - start_x)
+
+    # Ensure the angle is between 0 and 2*pi
+    angle_rad = (angle_rad + 2 * math.pi) % (2 * math.pi)
+
+    # Convert the angle to degrees
+    angle_deg = math.degrees(angle_rad)
+    
+    return angle_deg
+
+# Function to create a passing map
+def create_passing_map(game_data, selected_team):
+    # Filter for 'pass' actions for the selected team
+    pass_actions = game_data[(game_data['type_name'] == 'pass') & (game_data['team_id'] == selected_team)]
+
+    # Determine if the pass was successful
+    pass_actions['pass_outcome'] = pass_actions['result_name'].apply(lambda x: 'success' if x == 'success' else 'fail')
+    pass_actions['angle'] = pass_actions.apply(calculate_angle, axis=1)
+    #st.write(pass_actions.head(50))
+    # Define field dimensions; you might adjust these based on the coordinate system in your data
+    # Store as variables we can easily reuse for the plots
+    field_length_min =  0.0
+    field_length_max = 105.0
+    field_width_min = 0.0
+    field_width_max = 68.0
+
+    # Create the base line chart with varying line width for direction
+    pass_chart = alt.Chart(pass_actions).mark_line().encode(
+        x=alt.X('start_x:Q', scale=alt.Scale(domain=(field_length_min, field_length_max)), title='Start X'),
+        y=alt.Y('start_y:Q', scale=alt.Scale(domain=(field_width_min, field_width_max)), title='Start Y'),
+        x2='end_x:Q',
+        y2='end_y:Q',
+        color=alt.condition(
+            alt.datum.pass_outcome == 'success',
+            alt.value('green'),  # The pass was successful
+            alt.value('red')     # The pass was not successful
+        ),
+        tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'pass_outcome', 'player_name', alt.Tooltip('xt_added', format='.3f', title='xT added')]
+    ).properties(
+        title='Pass Start and End Points',
+        width=700,
+        height=400  # Keeping the aspect ratio of the field in mind
+    )
+
+    # # Adding arrows to the end of each line
+    # # Arrow chart for indicating direction
+    # arrow_chart = alt.Chart(pass_actions).mark_point(
+    #     shape='arrow', 
+    #     filled=True,
+    #     size=100  # Adjust size as needed
+    # ).encode(
+    #     x='end_x:Q',
+    #     y='end_y:Q',
+    #     angle=alt.Angle('angle', scale=alt.Scale(domain=[0, 360])),
+    #     color=alt.condition(
+    #         alt.datum.pass_outcome == 'success',
+    #         alt.value('green'),  # The pass was successful
+    #         alt.value('red')     # The pass was not successful
+    #     ),
+    #     tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'angle', 'pass_outcome']  # Adding start_x and start_y to tooltip
+    # )
+
+    arrow_chart = alt.Chart(pass_actions).mark_point(
+    shape='circle',
+    filled=True,
+    size=100,  # Adjust size as needed
+).encode(
+    x='end_x:Q',
+    y='end_y:Q',
+    theta=alt.Theta('angle', title='Direction'),  # Specify the direction using the angle
+    color=alt.condition(
+        alt.datum.pass_outcome == 'success',
+        alt.value('green'),  # The pass was successful
+        alt.value('red')     # The pass was not successful
+    ),
+    tooltip=['start_x', 'start_y', 'end_x', 'end_y', 'angle', 'pass_outcome']  # Adding start_x and start_y to tooltip
+)
+    # Combine the line chart and the arrow chart
+    combined_chart = pass_chart + arrow_chart
+    combined_chart = combined_chart.properties(
+        title='Pass Start and End Points',
+        width=700,
+        height=400
+    )
+
+    return combined_chart
+
+def create_shot_map(game_data, selected_team):
+    shot_data = game_data[(game_data['type_name'] == 'shot') & (game_data['team_id'] == selected_team)]
+
+    field_length_min =  0.0
+    field_length_max = 105.0
+    field_width_min = 0.0
+    field_width_max = 68.0
+    
+    minimum_point_size = 50  
+
+    # Create points for shots
+    shots = alt.Chart(shot_data).mark_point(filled=True).encode(
+    x=alt.X('start_x', scale=alt.Scale(domain=(0, field_length_max))),
+    y=alt.Y('start_y', scale=alt.Scale(domain=(0, field_width_max))),
+    color='result_name:N',
+    size=alt.Size('result_name:N', 
+                  scale=alt.Scale(range=[minimum_point_size, 2 * minimum_point_size]), 
+                  legend=None),
+    tooltip=['player_name', 'time_minutes', 'start_x', 'start_y',  'result_name']
+    ).properties(
+        width=700,
+        height=400
+    )
+
+    return shots
+
+def calc_action_weight(result_name, type_name):
+
+    action_weights = {
+        "success" : {"pass": 1, "shot": 5},
+        "fail" : {"pass": -1, "shot": 1}
+    }
+    try:
+      weight = action_weights[result_name][type_name]
+    except:
+      weight = 0
+    return weight
+
+
+def calc_game_momentum(game_data, game_id, perspective_team_id = 0, weight_span = 3):
+
+    # Convert time from seconds to minutes for easier processing
+    game_data['time_minutes'] = game_data['time_seconds'] // 60 + 45 * (game_data['period_id'] -1)
+
+    # Define action weights
+    action_weights = {"pass": 1, "shot": 2}
+
+    # Filter for relevant actions
+    relevant_actions = game_data[game_data['type_name'].isin(action_weights.keys())]
+
+    # Avoid SettingWithCopyWarning by creating a new DataFrame instead of modifying a slice
+    relevant_actions_fixed = relevant_actions.copy()
+    relevant_actions_fixed['action_weight'] = relevant_actions_fixed.apply(lambda x: calc_action_weight(x.result_name, x.type_name), axis=1)
+
+    # Group the data by game, minute, and team to count weighted actions and calculate the average x-coordinate
+    weighted_grouped_data = relevant_actions_fixed.groupby(['game_id', 'time_minutes', 'team_name']).agg(
+        weighted_actions=pd.NamedAgg(column='action_weight', aggfunc='sum'),
+        avg_start_x=pd.NamedAgg(column='start_x', aggfunc='mean')
+    ).reset_index()
+
+    # # Calculate momentum
+    weighted_grouped_data['momentum'] = ((weighted_grouped_data['avg_start_x'] - 50) / 50) * weighted_grouped_data['weighted_actions']
+
+    # # Dynamically determine the teams based on the data
+    teams = weighted_grouped_data['team_name'].unique()
+    # Callers (the app, the API's 404 and the pre-render batch) treat None as no momentum for this game
+    if len(teams) != 2:
+        return None
+
+    if perspective_team_id == 0:
+        team_1_id, team_2_id = teams[0], teams[1]
+    else:
+        team_1_id = perspective_team_id
+        team_2_id = np.setdiff1d(weighted_grouped_data['team_name'].unique(), perspective_team_id)[0]
+
+    # weighted average by teamId
+    team1_df = weighted_grouped_data[weighted_grouped_data['team_name'] == team_1_id]
+    team2_df = weighted_grouped_data[weighted_grouped_data['team_name'] == team_2_id]
+    team1_df['weighted_avg_momentum'] = team1_df.iloc[:,5].ewm(span=weight_span).mean()
+    team2_df['weighted_avg_momentum'] = -1 * team2_df.iloc[:,5].ewm(span=weight_span).mean()
+    team2_df['momentum'] = -1 * team2_df['momentum']
+
+    # # Adjust momentum calculation considering the team identity.
+    weighted_grouped_data = pd.concat([team1_df, team2_df])
+
+    # # Create a DataFrame for momentum difference per minute
+    momentum_per_minute = weighted_grouped_data.groupby('time_minutes')[['momentum', 'weighted_avg_momentum']].sum().reset_index()
+
+    # # Normalize the momentum values to be between -1 and 1
+    max_momentum = momentum_per_minute['momentum'].abs().max()
+    momentum_per_minute['momentum'] = momentum_per_minute['momentum'].apply(lambda x: x / max_momentum)
+    momentum_per_minute['weighted_avg_momentum'] = momentum_per_minute['weighted_avg_momentum'].apply(lambda x: x / max_momentum)
+
+    # Assign 'Team 1' or 'Team 2' based on the sign of the momentum
+    momentum_per_minute['team'] = momentum_per_minute['momentum'].apply(
+        lambda x: team_1_id if x >= 0 else team_2_id
+    )
+    
+    return momentum_per_minute
+
+def create_momentum_chart(game_momentum_df):
+    game_momentum_df['pos_momentum'] = game_momentum_df['momentum'].apply(lambda x: max(x, 0))
+    game_momentum_df['neg_momentum'] = game_momentum_df['momentum'].apply(lambda x: min(x, 0))
+
+    posChart = alt.Chart(game_momentum_df).mark_area().encode(
+        x="time_minutes",
+        y=alt.Y("pos_momentum", scale=alt.Scale(domain=[-1, 1])),
+        tooltip=["time_minutes", "pos_momentum", "team"]  # Added team to tooltip
+
+    )
+
+    negChart = alt.Chart(game_momentum_df).mark_area().encode(
+        x="time_minutes",
+        y=alt.Y("neg_momentum", scale=alt.Scale(domain=[-1, 1])),
+        fill = alt.value("red"),
+        tooltip=["time_minutes", "neg_momentum", "team"]  # Added team to tooltip
+    )
+
+    game_momentum_df['pos_momentum_weighted'] = game_momentum_df['weighted_avg_momentum'].apply(lambda x: max(x, 0))
+    game_momentum_df['neg_momentum_weighted'] = game_momentum_df['weighted_avg_momentum'].apply(lambda x: min(x, 0))
+
+    posChart_w = alt.Chart(game_momentum_df).mark_area().encode(
+        x="time_minutes",
+        y=alt.Y("pos_momentum_weighted", title = "Momentum", scale=alt.Scale(domain=[-1, 1])),
+        #tooltip=["time_minutes", "pos_momentum_weighted", "team"]  # Added team to tooltip
+        fill=alt.ColorValue('#0068c9')
+
+    )
+
+    negChart_w = alt.Chart(game_momentum_df).mark_area().encode(
+        x="time_minutes",
+        y=alt.Y("neg_momentum_weighted", title = "Momentum", scale=alt.Scale(domain=[-1, 1])),
+        #tooltip=["time_minutes", "neg_momentum_weighted", "team"],
+        fill = alt.ColorValue('#83c9ff')
+    )
+
+    # Calculate the midpoint of the time range
+    midpoint = game_momentum_df['time_minutes'].max() / 2
+    
+    # Extract the team names
+    team1_name = game_momentum_df[game_momentum_df['momentum'] >= 0]['team'].iloc[0]  # Assuming positive momentum indicates Team 1
+    team2_name = game_momentum_df[game_momentum_df['momentum'] < 0]['team'].iloc[0]   # Assuming negative momentum indicates Team 2
+    
+    
+    # Text chart for Team 1 (positioned towards the top)
+    textChart_team1 = alt.Chart(pd.DataFrame({'time_minutes': [midpoint], 'pos': [0.8]})).mark_text(
+        align='center', baseline='middle'
+    ).encode(
+        x=alt.X('time_minutes:Q', axis=alt.Axis(title="Game Time (Minutes)")),
+        y='pos:Q',
+        text=alt.value(team1_name)  # Using the actual name of Team 1
+    )
+    
+    # Text chart for Team 2 (positioned towards the bottom)
+    textChart_team2 = alt.Chart(pd.DataFrame({'time_minutes': [midpoint], 'neg': [-0.8]})).mark_text(
+        align='center', baseline='middle'
+    ).encode(
+        x=alt.X('time_minutes:Q', axis=alt.Axis(title="Game Time (Minutes)")),
+        y='neg:Q',
+        text=alt.value(team2_name)  # Using the actual name of Team 2
+    )
+
+    return posChart_w + negChart_w + textChart_team1 + textChart_team2
+
+def compute_game_statistics(game_data):
+    # Ensure there are two teams
+    teams = game_data['team_name'].unique()
+    if len(teams) != 2:
+        return None
+    
+    # Aggregating action counts for each team
+    # Defining the actions of interest and their respective conditions
+    actions_conditions = {
+        'dribble': (game_data['type_name'] == 'dribble'),
+        'pass': (game_data['type_name'] == 'pass'),
+        'shot': (game_data['type_name'] == 'shot'),
+        'save': (game_data['type_name'] == 'save'),
+        'successful pass': ((game_data['type_name'] == 'pass') & (game_data['result_name'] == 'success')),
+        'goal': ((game_data['type_name'] == 'shot') & (game_data['result_name'] == 'success'))
+    }
+    
+    # Aggregating counts for each action
+    aggregated_data = pd.DataFrame()
+    for action_name, condition in actions_conditions.items():
+        action_data = game_data[condition].groupby('team_name').size().reset_index(name='Count')
+        action_data['type_name'] = action_name
+        aggregated_data = pd.concat([aggregated_data, action_data])
+    
+    # Pivoting the data for visualization
+    pivot_data = aggregated_data.pivot(index='type_name', columns='team_name', values='Count').reset_index()
+    pivot_data.columns.name = None
+    
+    # Renaming the columns to match the sample data structure
+    team_names = pivot_data.columns[1:]
+    pivot_data.rename(columns={team_names[0]: team_names[0], team_names[1]: team_names[1]}, inplace=True)
+    
+    # Melt the DataFrame to prepare the data
+    df_melted = pivot_data.melt(id_vars='type_name', var_name='Team', value_name='Count')
+    
+    # Calculate percentages
+    total_counts = df_melted.groupby('type_name')['Count'].transform('sum')
+    df_melted['Percentage'] = df_melted['Count'] / total_counts * 100
+
+    return df_melted
+
+def create_game_statistics_chart(df_melted):
+    teams = df_melted['Team'].unique()
+
+    # Create the base chart
+    base = alt.Chart(df_melted).encode(
+        y=alt.Y('type_name:N', axis=alt.Axis(title='', labels=True), sort=df_melted['type_name'].unique().tolist()),
+        x=alt.X('sum(Percentage):Q', axis=alt.Axis(title='Percentage'), scale=alt.Scale(domain=[0, 100])),
+        color=alt.Color('Team:N', legend=alt.Legend(title="Team", orient = 'top')),
+        order=alt.Order('Team:N', sort='ascending')
+    )
+    
+    # Create the bar chart with labels
+    bars = base.mark_bar().encode(
+        tooltip=['type_name:N', 'Team:N', 'Percentage:Q']
+    )
+     
+    # Create labels using mark_text
+    labels = base.mark_text(
+        #align=alt.condition(alt.datum['Team'] == team_names[0], alt.value('right'), alt.value('left')),
+        align = 'center',
+        baseline='middle',  # Center the text vertically within the bars
+        dx = 0,
+        dy=0  # No vertical displacement
+    ).encode(
+        text=alt.Text('Count:Q', format=','),
+        color=alt.value('white'),  # Set the text content color to white
+        x='sum(Percentage):Q',  # Position the text at the starting point of the bars
+)
+
+
+   # Create labels for each team
+    labels_team1 = base.transform_filter(alt.datum['Team'] == teams[0]).mark_text(
+        align='left',
+        baseline='middle',
+        dx=5,
+    ).encode(
+        text=alt.Text('Count:Q', format=','),
+        color=alt.value('white'),
+        x=alt.value(0),  # Set x to 0 for Team 1
+    )
+    
+    labels_team2 = base.transform_filter(alt.datum['Team'] == teams[1]).mark_text(
+        align='right',
+        baseline='middle',
+        dx=200,
+    ).encode(
+        text=alt.Text('Count:Q', format=','),
+        color=alt.value('white'),
+        x=alt.value(100),  # Set x to 100 for Team 2
+    )
+    
+    # Layer the bar chart with text
+    chart = (bars + labels_team1 + labels_team2).properties(width=400, height=350)
+
+    
+
+    # Layer the bar chart with text
+    #chart = (bars + labels).properties(width=600, height=200)
+    
+    
+
+    
+    
+    # Layer the bar chart with text
+    #chart = bars.properties(width=600, height=200)
+    #st.altair_chart(bars.properties(width=600, height=200))
+
+    return chart
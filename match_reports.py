@@ -0,0 +1,45 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+# Pre-rendered match reports live in a content-addressed directory: each
+# report is stored under a hash of the game's action rows and REPORT_VERSION,
+# so a report is only reused while both the data and the chart code that
+# produced it are unchanged.
+
+REPORT_VERSION = 2
+
+REPORTS_DIR = 'match_reports'
+
+
+# Function to compute the content address of a game's report
+def report_key(game_data):
+    row_hashes = pd.util.hash_pandas_object(game_data, index=False).to_numpy()
+    digest = hashlib.sha256(f'v{REPORT_VERSION}'.encode())
+    digest.update(','.join(game_data.columns).encode())
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+def report_path(game_data, reports_dir=REPORTS_DIR):
+    key = report_key(game_data)
+    return os.path.join(reports_dir, key[:2], key)
+
+
+# Function to load the Vega-Lite specs of a pre-rendered report (None when the game has no report yet)
+def load_report(game_data, reports_dir=REPORTS_DIR):
+    path = report_path(game_data, reports_dir)
+    manifest_path = os.path.join(path, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    specs = {}
+    for chart_name in manifest['charts']:
+        with open(os.path.join(path, chart_name + '.vl.json')) as f:
+            specs[chart_name] = json.load(f)
+    return specs
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+
+# Possession chains are maximal runs of consecutive actions by the same team
+# within one period of one game. Everything here works on whole columns at
+# once so a full multi-league season segments in a single pass.
+
+# Order of the ending categories stored in the 'ending' column
+POSSESSION_ENDINGS = ['goal', 'shot', 'turnover', 'period_end']
+
+
+# Function to sort actions into game order and return the sort positions
+def order_actions(actions):
+    # lexsort uses the last key as the primary one
+    return np.lexsort((
+        actions['action_id'].to_numpy(),
+        actions['time_seconds'].to_numpy(),
+        actions['period_id'].to_numpy(),
+        actions['game_id'].to_numpy(),
+    ))
+
+
+# Function to flag the first action of every possession chain (run-length encoding on team_id)
+def chain_starts(game_ids, period_ids, team_ids):
+    starts = np.ones(len(team_ids), dtype=bool)
+    starts[1:] = (
+        (game_ids[1:] != game_ids[:-1])
+        | (period_ids[1:] != period_ids[:-1])
+        | (team_ids[1:] != team_ids[:-1])
+    )
+    return starts
+
+
+# Function to label every action with the id of the possession chain it belongs to
+def assign_possession_ids(actions):
+    order = order_actions(actions)
+    starts = chain_starts(
+        actions['game_id'].to_numpy()[order],
+        actions['period_id'].to_numpy()[order],
+        actions['team_id'].to_numpy()[order],
+    )
+
+    possession_ids = np.empty(len(order), dtype=np.int32)
+    possession_ids[order] = np.cumsum(starts) - 1
+
+    return pd.Series(possession_ids, index=actions.index, name='possession_id')
+
+
+# Function to split the actions into possession chains, one row per chain
+def segment_possessions(actions):
+    if len(actions) == 0:
+        return pd.DataFrame(columns=['possession_id', 'game_id', 'period_id', 'team_id', 'n_actions',
+                                     'start_time', 'duration', 'start_x', 'end_x', 'progression',
+                                     'end_action', 'ending'])
+
+    order = order_actions(actions)
+    game_ids = actions['game_id'].to_numpy()[order]
+    period_ids = actions['period_id'].to_numpy()[order]
+    team_ids = actions['team_id'].to_numpy()[order]
+    times = actions['time_seconds'].to_numpy(dtype=np.float64)[order]
+    start_x = actions['start_x'].to_numpy(dtype=np.float64)[order]
+    end_x = actions['end_x'].to_numpy(dtype=np.float64)[order]
+    type_names = actions['type_name'].to_numpy()[order]
+    result_names = actions['result_name'].to_numpy()[order]
+
+    starts = chain_starts(game_ids, period_ids, team_ids)
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(order)) - 1
+
+    # How the chain ended: a goal or shot by the team in possession, the ball
+    # going to the other team, or the period running out
+    last_type = type_names[last]
+    is_shot = np.char.startswith(last_type.astype(str), 'shot')
+    is_goal = is_shot & (result_names[last] == 'success')
+    same_period_follows = np.zeros(len(first), dtype=bool)
+    same_period_follows[:-1] = (
+        (game_ids[first[1:]] == game_ids[first[:-1]])
+        & (period_ids[first[1:]] == period_ids[first[:-1]])
+    )
+    ending_codes = np.select(
+        [is_goal, is_shot, same_period_follows],
+        [0, 1, 2],
+        default=3,
+    )
+
+    chains = pd.DataFrame({
+        'possession_id': np.arange(len(first), dtype=np.int32),
+        'game_id': game_ids[first],
+        'period_id': period_ids[first].astype(np.int8),
+        'team_id': team_ids[first],
+        'n_actions': (last - first + 1).astype(np.int16),
+        'start_time': times[first].astype(np.float32),
+        'duration': (times[last] - times[first]).astype(np.float32),
+        'start_x': start_x[first].astype(np.float32),
+        'end_x': end_x[last].astype(np.float32),
+        # Coordinates are in the acting team's frame with the opponent's goal at x=0 (shots end near
+        # x=0, goal kicks start at x=100), so progression is the distance gained towards x=0
+        'progression': (start_x[first] - end_x[last]).astype(np.float32),
+        'end_action': pd.Categorical(last_type),
+        'ending': pd.Categorical.from_codes(ending_codes, categories=POSSESSION_ENDINGS),
+    })
+
+    return chains
+
+
+# Function to summarise possession chains per team for one game
+def possession_summary(chains):
+    summary = chains.groupby('team_id', observed=True).agg(
+        possessions=pd.NamedAgg(column='possession_id', aggfunc='size'),
+        avg_actions=pd.NamedAgg(column='n_actions', aggfunc='mean'),
+        avg_duration=pd.NamedAgg(column='duration', aggfunc='mean'),
+        avg_progression=pd.NamedAgg(column='progression', aggfunc='mean'),
+        total_duration=pd.NamedAgg(column='duration', aggfunc='sum'),
+    ).reset_index()
+    summary['possession_share'] = summary['total_duration'] / summary['total_duration'].sum()
+    return summary
@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Background cache warming for the Match Analysis page. As soon as the
+# sidebar narrows the choice down (a team, then an opponent) the likely next
+# games are warmed on a small thread pool, so the final date pick is a cache
+# hit. Each session's pending work is cancelled when its selection changes,
+# and the most viewed games are warmed when the server starts.
+
+POPULAR_MATCHES_PATH = 'popular_matches.json'
+
+
+class Prefetcher:
+
+    def __init__(self, warm_fn, max_workers=2, max_pending=12, max_sessions=256, popular_path=POPULAR_MATCHES_PATH):
+        self.warm_fn = warm_fn
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kicklogic-prefetch')
+        self.lock = threading.Lock()
+        # Per session, least recently active first: the generation of its latest request and the futures it queued
+        self.generations = OrderedDict()
+        self.futures = {}
+        self.last_request = {}
+        self.popular_path = popular_path
+        self.views = Counter()
+        if popular_path and os.path.exists(popular_path):
+            # The counts are only a warm-up hint, so an unreadable file is ignored
+            try:
+                with open(popular_path) as f:
+                    self.views.update({int(k): v for k, v in json.load(f).items()})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Ignoring unreadable {popular_path}: {e}")
+
+    # Function to queue warming for a session's candidate keys, cancelling its previous request
+    def prefetch(self, keys, owner='default'):
+        keys = list(dict.fromkeys(keys))[:self.max_pending]
+        with self.lock:
+            # Reruns with an unchanged selection keep the work already queued
+            if self.last_request.get(owner) == keys:
+                return
+            self.last_request[owner] = keys
+            generation = self.generations.pop(owner, 0) + 1
+            self.generations[owner] = generation
+            for future in self.futures.get(owner, []):
+                future.cancel()
+            self.futures[owner] = [self.pool.submit(self.run, key, owner, generation) for key in keys]
+            # Sessions end without notice, so the least recently active ones are dropped
+            while len(self.generations) > self.max_sessions:
+                self.forget(next(iter(self.generations)))
+
+    # Function to drop a session's state and cancel its queued work (call with the lock held)
+    def forget(self, owner):
+        self.generations.pop(owner, None)
+        self.last_request.pop(owner, None)
+        for future in self.futures.pop(owner, []):
+            future.cancel()
+
+    def run(self, key, owner, generation):
+        # Work that started before a newer request still finishes; queued work is skipped
+        if self.generations.get(owner) != generation:
+            return
+        try:
+            self.warm_fn(key)
+        except Exception as e:
+            print(f"Prefetch of {key} failed: {e}")
+
+    # Function to count a view of a game and persist the counts for the next server start
+    def record_view(self, key):
+        with self.lock:
+            self.views[key] += 1
+            if self.popular_path:
+                # Written whole to a temporary file and renamed, so a reader never sees a partial file
+                tmp_path = f'{self.popular_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump({str(k): v for k, v in self.views.items()}, f)
+                os.replace(tmp_path, self.popular_path)
+
+    def warm_popular(self, n=10):
+        self.prefetch([key for key, _ in self.views.most_common(n)], owner='popular')
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import vl_convert as vlc
+
+from expected_threat import XT_COLUMNS, load_or_fit_xt, load_xt_model, rate_actions
+from match_analysis import (calc_game_momentum, compute_game_statistics, create_game_statistics_chart,
+                            create_momentum_chart, create_passing_map, create_shot_map)
+from match_reports import REPORTS_DIR, report_path
+from query_layer import KickLogicDB
+from team_dimension import build_team_dimension, TeamLookup
+
+
+# Batch command that renders the four Match Analysis charts for every game in
+# match_details.csv ahead of time. Historical matches never change, so the
+# app can serve these reports and only compute charts live for new games.
+#
+# Usage: python prerender_reports.py [--reports-dir match_reports] [--workers 4] [--force]
+
+# Per-process state, opened once by init_worker
+worker_db = None
+worker_xt = None
+worker_teams = None
+
+
+def init_worker(data_dir, xt_model_path):
+    global worker_db, worker_xt, worker_teams
+    worker_db = KickLogicDB(data_dir)
+    worker_xt = load_xt_model(xt_model_path)
+    worker_teams = TeamLookup(build_team_dimension(pd.read_csv(os.path.join(data_dir, 'teams_enriched.csv'))))
+
+
+# Function to build the same charts main1 shows when 'All Players' is selected
+def build_match_charts(game_data, game_id, team_ids):
+    charts = {}
+    game_statistics = compute_game_statistics(game_data)
+    if game_statistics is not None:
+        charts['statistics'] = create_game_statistics_chart(game_statistics)
+    for team_id in team_ids:
+        team_data = game_data[game_data['team_id'] == team_id]
+        charts[f'passes_{team_id}'] = create_passing_map(team_data.copy(), team_id)
+        charts[f'shots_{team_id}'] = create_shot_map(game_data, team_id)
+    momentum = calc_game_momentum(game_data.copy(), game_id)
+    if momentum is not None:
+        charts['momentum'] = create_momentum_chart(momentum)
+    return charts
+
+
+# Function to render one game's report into its content-addressed directory
+def render_game(game_id, team_names, reports_dir, force=False):
+    game_data = worker_db.game_actions(game_id)
+    if game_data.empty:
+        return game_id, None, False
+    game_data = game_data.assign(xt_added=rate_actions(game_data, worker_xt))
+    path = report_path(game_data, reports_dir)
+    if not force and os.path.exists(os.path.join(path, 'manifest.json')):
+        return game_id, path, False
+
+    team_ids = [worker_teams.team_id(name) for name in team_names]
+    charts = build_match_charts(game_data, game_id, team_ids)
+
+    os.makedirs(path, exist_ok=True)
+    for chart_name, chart in charts.items():
+        spec = chart.to_dict()
+        with open(os.path.join(path, chart_name + '.vl.json'), 'w') as f:
+            json.dump(spec, f)
+        with open(os.path.join(path, chart_name + '.svg'), 'w') as f:
+            f.write(vlc.vegalite_to_svg(spec))
+        with open(os.path.join(path, chart_name + '.png'), 'wb') as f:
+            f.write(vlc.vegalite_to_png(spec, scale=2))
+
+    # The manifest is written last so a half-written report is never served
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump({'game_id': int(game_id), 'team_ids': [int(t) for t in team_ids], 'charts': list(charts)}, f)
+    return game_id, path, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render Match Analysis reports for every game in match_details.csv')
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--reports-dir', default=REPORTS_DIR)
+    parser.add_argument('--xt-model', default='xt_model.npz')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--force', action='store_true', help='re-render reports that already exist')
+    args = parser.parse_args()
+
+    db = KickLogicDB(args.data_dir)
+    matches = db.matches(['game_id', 'team_1', 'team_2'])
+
+    # Workers score xT with the same saved grid the app uses, refit here if it is missing or outdated
+    load_or_fit_xt(args.xt_model, lambda: db.actions(XT_COLUMNS))
+    start = time.time()
+    rendered = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.data_dir, args.xt_model)) as pool:
+        futures = {pool.submit(render_game, int(row.game_id), [row.team_1, row.team_2], args.reports_dir, args.force): int(row.game_id)
+                   for row in matches.itertuples()}
+        for future in as_completed(futures):
+            try:
+                game_id, path, was_rendered = future.result()
+            except Exception as e:
+                print(f"{futures[future]}: failed to render ({e})")
+                continue
+            rendered += was_rendered
+            if path is None:
+                print(f"{game_id}: no actions, skipped")
+            else:
+                print(f"{game_id}: {'rendered' if was_rendered else 'up to date'} -> {path}")
+
+    print(f"Rendered {rendered} of {len(matches)} reports in {time.time() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import numpy as np
+
+
+# Mergeable KLL quantile sketches. A sketch keeps a few hundred weighted
+# samples per stream no matter how many values it has seen, can be merged
+# with another sketch of the same stream, and answers quantile/percentile
+# queries from a small precomputed CDF instead of rescanning the raw rows.
+
+
+class KLLSketch:
+
+    def __init__(self, k=200, c=2 / 3, seed=0):
+        self.k = k
+        self.c = c
+        self.rng = np.random.default_rng(seed)
+        # compactors[h] holds items that each stand for 2**h values
+        self.compactors = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._cdf = None
+
+    def capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * self.c ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.compress()
+        return self
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    # Function to halve every over-full level, promoting a random half of its sorted items
+    def compress(self):
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays on this level
+                keep = items[len(items) - len(items) % 2:]
+                items = items[:len(items) - len(items) % 2]
+                promoted = items[self.rng.integers(2)::2]
+                self.compactors[level] = keep
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+            level += 1
+        self._cdf = None
+
+    # Function to build (and cache) the sorted values and their cumulative weight fractions
+    def cdf(self):
+        if self._cdf is None:
+            values = np.concatenate(self.compactors)
+            weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.compactors)])
+            order = np.argsort(values, kind='stable')
+            cumulative = np.cumsum(weights[order])
+            self._cdf = (values[order], cumulative / cumulative[-1] if len(cumulative) else cumulative)
+        return self._cdf
+
+    # Function to get the value at quantile q (0-1)
+    def quantile(self, q):
+        values, fractions = self.cdf()
+        if len(values) == 0:
+            return np.nan
+        index = np.searchsorted(fractions, np.clip(q, 0, 1), side='left')
+        return values[np.minimum(index, len(values) - 1)]
+
+    # Function to get the percentage of values less than or equal to x
+    def percentile(self, x):
+        values, fractions = self.cdf()
+        if len(values) == 0:
+            return np.nan
+        index = np.searchsorted(values, x, side='right')
+        return 100 * np.where(index > 0, fractions[np.maximum(index - 1, 0)], 0.0)
+
+
+# Function to sketch each metric of a table per group, e.g. playerankScore per roleCluster
+def build_group_sketches(df, group_col, metrics, k=200):
+    sketches = {metric: {} for metric in metrics}
+    return update_group_sketches(sketches, df, group_col, k=k)
+
+
+# Function to fold new rows (e.g. newly played matches) into existing group sketches
+def update_group_sketches(sketches, df, group_col, k=200):
+    for group, rows in df.groupby(group_col, sort=False):
+        for metric, group_sketches in sketches.items():
+            if group not in group_sketches:
+                group_sketches[group] = KLLSketch(k=k)
+            group_sketches[group].update(rows[metric].to_numpy())
+    return sketches
+
+
+# Function to merge two sets of group sketches built on separate partitions (e.g. per league)
+def merge_group_sketches(sketches, other):
+    for metric, group_sketches in other.items():
+        target = sketches.setdefault(metric, {})
+        for group, sketch in group_sketches.items():
+            if group in target:
+                target[group].merge(sketch)
+            else:
+                target[group] = sketch
+    return sketches
@@ -0,0 +1,137 @@
+import os
+
+import duckdb
+
+from datasets import TABLES, stale_tables
+
+
+# Embedded DuckDB layer over the KickLogic datasets. Every table is registered
+# as a view over its Parquet file when one exists (written by validation.py)
+# and over the CSV otherwise, so pages only ever materialise the filtered,
+# column-pruned result of a query instead of whole tables.
+
+
+# Function to quote a column name for use in SQL
+def quote_column(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+# Function to build a parameterised IN clause (an empty list matches nothing)
+def in_clause(column, values):
+    values = list(values)
+    if not values:
+        return 'FALSE', []
+    return f"{quote_column(column)} IN ({', '.join('?' for _ in values)})", values
+
+
+class KickLogicDB:
+
+    def __init__(self, data_dir='.'):
+        # Ingest is an explicit step; refuse to serve unvalidated or outdated data
+        stale = stale_tables(data_dir)
+        if stale:
+            raise RuntimeError(f"Parquet data for {', '.join(stale)} is missing or older than its CSV; "
+                               f"run 'python validation.py {data_dir}' first")
+
+        self.con = duckdb.connect()
+        self.tables = []
+        for table, file_name in TABLES.items():
+            parquet_path = os.path.join(data_dir, file_name + '.parquet')
+            csv_path = os.path.join(data_dir, file_name + '.csv')
+            if os.path.exists(parquet_path):
+                source = f"read_parquet('{parquet_path}')"
+            elif os.path.exists(csv_path):
+                source = f"read_csv_auto('{csv_path}')"
+            else:
+                continue
+            self.con.execute(f"CREATE VIEW {table} AS SELECT * FROM {source}")
+            self.tables.append(table)
+
+        # The match selectors only offer games with clean actions; games quarantined at ingest have nothing to show
+        if 'matches' in self.tables:
+            playable = "WHERE CAST(game_id AS BIGINT) IN (SELECT DISTINCT game_id FROM actions)" if 'actions' in self.tables else "WHERE FALSE"
+            self.con.execute(f"CREATE VIEW playable_matches AS SELECT * FROM matches {playable}")
+
+    # Run a query on its own cursor so Streamlit sessions on other threads can share the connection
+    def query(self, sql, params=None):
+        cursor = self.con.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def select(self, table, columns=None, where='TRUE', params=None, order_by=None):
+        column_list = ', '.join(quote_column(c) for c in columns) if columns else '*'
+        sql = f"SELECT {column_list} FROM {table} WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {', '.join(quote_column(c) for c in order_by)}"
+        return self.query(sql, params)
+
+    # Action data
+
+    def actions(self, columns=None):
+        return self.select('actions', columns)
+
+    def game_actions(self, game_id, columns=None):
+        return self.select('actions', columns, 'game_id = ?', [int(game_id)])
+
+    def team_game_actions(self, game_id, team_name, columns=None):
+        return self.select('actions', columns, 'game_id = ? AND team_name = ?', [int(game_id), team_name])
+
+    # Match selection (games with clean actions only)
+
+    def home_teams(self):
+        return self.query("SELECT DISTINCT team_1 FROM playable_matches ORDER BY team_1")['team_1'].tolist()
+
+    def opponents(self, team_1):
+        return self.query("SELECT DISTINCT team_2 FROM playable_matches WHERE team_1 = ? ORDER BY team_2", [team_1])['team_2'].tolist()
+
+    def match_dates(self, team_1, team_2):
+        return self.query("SELECT DISTINCT game_date FROM playable_matches WHERE team_1 = ? AND team_2 = ? ORDER BY game_date",
+                          [team_1, team_2])['game_date'].tolist()
+
+    def game_id(self, team_1, team_2, game_date):
+        result = self.query("SELECT CAST(game_id AS BIGINT) AS game_id FROM playable_matches WHERE team_1 = ? AND team_2 = ? AND game_date = ? LIMIT 1",
+                            [team_1, team_2, game_date])
+        return None if result.empty else int(result['game_id'].iloc[0])
+
+    # Games of team_1, the ones against team_2 first when given
+    def team_game_ids(self, team_1, team_2=None):
+        result = self.query("""
+            SELECT CAST(game_id AS BIGINT) AS game_id FROM playable_matches
+            WHERE team_1 = ?
+            ORDER BY team_2 = ? DESC, game_date
+        """, [team_1, team_2])
+        return result['game_id'].tolist()
+
+    def matches(self, columns=None):
+        return self.select('matches', columns)
+
+    # Player roles
+
+    def role_totals(self, min_minutes=0):
+        return self.query("""
+            SELECT roleCluster, CAST(SUM(goalScored) AS BIGINT) AS goalScored, CAST(SUM(minutesPlayed) AS BIGINT) AS minutesPlayed,
+                   CASE WHEN SUM(goalScored) > 0 THEN ROUND(SUM(minutesPlayed) / SUM(goalScored), 1) ELSE 0 END AS minutes_per_goal
+            FROM playerank
+            GROUP BY roleCluster
+            HAVING SUM(minutesPlayed) >= ?
+            ORDER BY roleCluster
+        """, [min_minutes])
+
+    def playerank(self, columns=None):
+        return self.select('playerank', columns)
+
+    # Clubs
+
+    def team_metrics(self, team_ids=None, columns=None):
+        if team_ids is None:
+            return self.select('teams', columns)
+        where, params = in_clause('team_id', [int(t) for t in team_ids])
+        return self.select('teams', columns, where, params)
+
+    def season_momentum(self, team_ids=None, columns=('team_id', 'time_minutes', 'weighted_avg_momentum', 'name')):
+        if team_ids is None:
+            return self.select('momentum', list(columns), order_by=['team_id', 'time_minutes'])
+        where, params = in_clause('team_id', [int(t) for t in team_ids])
+        return self.select('momentum', list(columns), where, params, order_by=['team_id', 'time_minutes'])
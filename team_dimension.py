@@ -0,0 +1,98 @@
+import ast
+import re
+
+import pandas as pd
+
+
+# Normalized team dimension built once at ingest from teams_enriched.csv.
+# Teams are keyed by team_id (the wyId of the raw file, which is also the
+# team_id used by the action, metrics and momentum tables) and every lookup
+# the pages need is a plain dict access instead of a DataFrame scan.
+
+# Countries whose clubs make up each league on the Club Analysis page
+LEAGUE_COUNTRIES = {
+    'England': ['England', 'Wales'],
+    'France': ['France', 'Monaco'],
+    'Germany': ['Germany'],
+    'Italy': ['Italy'],
+    'Spain': ['Spain'],
+}
+
+COUNTRY_LEAGUES = {country: league for league, countries in LEAGUE_COUNTRIES.items() for country in countries}
+
+# The escapes unicode_escape understands for a single character: \xe9, \u00e9 and \U000000e9
+ESCAPED_UNICODE = re.compile(r'\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8})')
+
+
+# Function to turn literal \u00e9 style escapes left in the raw names back into characters
+def decode_name(name):
+    if not isinstance(name, str) or not ESCAPED_UNICODE.search(name):
+        return name
+    return ESCAPED_UNICODE.sub(lambda m: chr(int(m.group(0)[2:], 16)), name)
+
+
+# Function to parse the stringified area dicts (each distinct string is parsed once)
+def parse_areas(areas):
+    parsed = {area: ast.literal_eval(area) for area in areas.dropna().unique()}
+    country = areas.map(lambda a: parsed[a]['name'] if a in parsed else None)
+    country_code = areas.map(lambda a: parsed[a]['alpha3code'] if a in parsed else None)
+    return country, country_code
+
+
+# Function to build the normalized team table
+def build_team_dimension(teams_df):
+    country, country_code = parse_areas(teams_df['area'])
+    dimension = pd.DataFrame({
+        'team_id': teams_df['wyId'].astype(int),
+        'name': teams_df['name'].map(decode_name),
+        'official_name': teams_df['officialName'].map(decode_name),
+        'raw_name': teams_df['name'],
+        'city': teams_df['city'].map(decode_name),
+        'country': country,
+        'country_code': country_code,
+        'type': teams_df['type'],
+        'latitude': teams_df['latitude'],
+        'longitude': teams_df['longitude'],
+    })
+    dimension['league'] = dimension['country'].map(COUNTRY_LEAGUES).where(dimension['type'] == 'club')
+    return dimension.drop_duplicates('team_id').reset_index(drop=True)
+
+
+class TeamLookup:
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.names = dict(zip(dimension['team_id'], dimension['name']))
+        self.leagues = dict(zip(dimension['team_id'], dimension['league']))
+        self.countries = dict(zip(dimension['team_id'], dimension['country']))
+
+        self.league_ids = {}
+        for team_id, league in self.leagues.items():
+            if isinstance(league, str):
+                self.league_ids.setdefault(league, []).append(team_id)
+
+        # Any spelling of a team maps back to its id, case-insensitively
+        self.aliases = {}
+        for column in ['raw_name', 'official_name', 'name']:
+            for team_id, alias in zip(dimension['team_id'], dimension[column]):
+                if isinstance(alias, str):
+                    self.aliases[alias.casefold()] = team_id
+
+    # Function to get the display name for a team id (falls back to the id itself)
+    def name(self, team_id):
+        return self.names.get(team_id, str(team_id))
+
+    def team_id(self, name):
+        return self.aliases.get(decode_name(name).casefold()) if isinstance(name, str) else None
+
+    def league(self, team_id):
+        return self.leagues.get(team_id)
+
+    def country(self, team_id):
+        return self.countries.get(team_id)
+
+    # Function to get the ids of every club in a league ('All' returns None, meaning no filter)
+    def league_team_ids(self, league):
+        if league == 'All':
+            return None
+        return self.league_ids.get(league, [])
@@ -0,0 +1,126 @@
+import os
+import sys
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from datasets import TABLES, copy_to_parquet, export_parquet
+from team_dimension import decode_name
+
+
+# Ingest-time validation for the action and playerank tables. Every check is
+# a columnwise mask over the whole table; rows failing any check go to a
+# quarantine table with the names of the checks they failed, and the clean
+# rows are written as the Parquet files the query layer reads. Pages can then
+# trust the data instead of patching it on every rerun.
+#
+# Usage: python validation.py [data_dir]
+
+FIELD_LENGTH = 105.0
+FIELD_WIDTH = 68.0
+
+# 1 and 2 are the halves, 3 and 4 extra time and 5 the penalty shootout
+VALID_PERIODS = [1, 2, 3, 4, 5]
+
+MAX_MINUTES_PLAYED = 130
+
+
+# Function to decode escaped names, converting each distinct name only once
+def fix_names(names):
+    uniques = names.dropna().unique()
+    decoded = {name: decode_name(name) for name in uniques if '\\' in name}
+    return names.replace(decoded) if decoded else names
+
+
+# Function to combine named boolean failure masks into (any failure, reason labels)
+def collect_failures(checks, index):
+    names = list(checks)
+    # One bit per check, so each row's failures are a single integer code
+    codes = np.zeros(len(index), dtype=np.int64)
+    for bit, name in enumerate(names):
+        codes |= np.asarray(checks[name], dtype=bool).astype(np.int64) << bit
+    failed = codes != 0
+
+    # The distinct failure codes are few, so each label is joined once
+    failed_codes, inverse = np.unique(codes[failed], return_inverse=True)
+    labels = np.array([','.join(name for bit, name in enumerate(names) if code >> bit & 1) for code in failed_codes], dtype=object)
+    reasons = pd.Series(labels[inverse], index=index[failed], dtype=object)
+    return pd.Series(failed, index=index), reasons
+
+
+# Function to split the action table into clean rows and quarantined rows with a 'reason' column
+def validate_actions(actions):
+    actions = actions.copy()
+    for column in ['player_name', 'team_name']:
+        if column in actions.columns:
+            actions[column] = fix_names(actions[column])
+
+    checks = {
+        'start_x_out_of_bounds': ~actions['start_x'].between(0, FIELD_LENGTH),
+        'end_x_out_of_bounds': ~actions['end_x'].between(0, FIELD_LENGTH),
+        'start_y_out_of_bounds': ~actions['start_y'].between(0, FIELD_WIDTH),
+        'end_y_out_of_bounds': ~actions['end_y'].between(0, FIELD_WIDTH),
+        'invalid_period': ~actions['period_id'].isin(VALID_PERIODS),
+        'negative_time': ~(actions['time_seconds'] >= 0),
+        'not_two_teams': actions.groupby('game_id')['team_id'].transform('nunique') != 2,
+        'duplicate_action_id': actions.duplicated(['game_id', 'action_id'], keep='first'),
+    }
+    if 'player_name' in actions.columns:
+        checks['undecodable_name'] = actions['player_name'].str.contains('\ufffd', regex=False, na=False)
+
+    failed, reasons = collect_failures(checks, actions.index)
+    quarantine = actions[failed].assign(reason=reasons)
+    return actions[~failed], quarantine
+
+
+# Function to split the playerank table into clean rows and quarantined rows with a 'reason' column
+def validate_playerank(playerank):
+    checks = {
+        'missing_role': playerank['roleCluster'].isna(),
+        'invalid_minutes': ~playerank['minutesPlayed'].between(0, MAX_MINUTES_PLAYED),
+        'negative_goals': ~(playerank['goalScored'] >= 0),
+        'invalid_score': ~np.isfinite(playerank['playerankScore'].to_numpy(dtype=np.float64)),
+        'duplicate_player_match': playerank.duplicated(['matchId', 'playerId'], keep='first'),
+    }
+    failed, reasons = collect_failures(checks, playerank.index)
+    quarantine = playerank[failed].assign(reason=reasons)
+    return playerank[~failed], quarantine
+
+
+# Function to write a DataFrame to Parquet through DuckDB
+def write_parquet(df, path):
+    con = duckdb.connect()
+    con.register('df', df)
+    copy_to_parquet(con, 'SELECT * FROM df', path)
+    con.close()
+
+
+VALIDATORS = {
+    'actions': validate_actions,
+    'playerank': validate_playerank,
+}
+
+
+# Function to validate the raw CSVs and write clean and quarantine Parquet files for the query layer
+def ingest(data_dir='.'):
+    # Tables without a validator are converted as they are
+    export_parquet(data_dir, [TABLES[t] for t in TABLES if t not in VALIDATORS and not t.endswith('_quarantine')])
+
+    for table, validator in VALIDATORS.items():
+        file_name = TABLES[table]
+        csv_path = os.path.join(data_dir, file_name + '.csv')
+        if not os.path.exists(csv_path):
+            continue
+        raw = pd.read_csv(csv_path)
+        raw = raw.loc[:, ~raw.columns.str.startswith('Unnamed:')]
+        clean, quarantine = validator(raw)
+        write_parquet(clean, os.path.join(data_dir, file_name + '.parquet'))
+        write_parquet(quarantine, os.path.join(data_dir, TABLES[table + '_quarantine'] + '.parquet'))
+        print(f"{table}: {len(clean):,} clean rows, {len(quarantine):,} quarantined")
+        if len(quarantine):
+            print(quarantine['reason'].str.split(',').explode().value_counts().to_string())
+
+
+if __name__ == '__main__':
+    ingest(sys.argv[1] if len(sys.argv) > 1 else '.')
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import altair as alt
+
+
+# Local player valuation engine behind the Player Valuation page. It works
+# from a FIFA-style player attribute export (one row per player, the same
+# columns that were averaged into streamlit_stats_2.csv), precomputes the
+# regional aggregates once and keeps a sorted name index for player search.
+
+PLAYERS_PATH = 'players_fifa.csv'
+
+ATTRIBUTES = ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic']
+
+REGION_NATIONS = {
+    'Europe': ['Albania', 'Austria', 'Belarus', 'Belgium', 'Bosnia and Herzegovina', 'Bulgaria', 'Croatia',
+               'Cyprus', 'Czech Republic', 'Czechia', 'Denmark', 'England', 'Estonia', 'Faroe Islands', 'Finland',
+               'France', 'Georgia', 'Germany', 'Greece', 'Hungary', 'Iceland', 'Israel', 'Italy', 'Kosovo',
+               'Latvia', 'Lithuania', 'Luxembourg', 'Malta', 'Montenegro', 'Netherlands', 'North Macedonia',
+               'Northern Ireland', 'Norway', 'Poland', 'Portugal', 'Republic of Ireland', 'Ireland', 'Romania',
+               'Russia', 'Scotland', 'Serbia', 'Slovakia', 'Slovenia', 'Spain', 'Sweden', 'Switzerland',
+               'Turkey', 'Ukraine', 'Wales', 'Armenia', 'Azerbaijan', 'Kazakhstan', 'Moldova'],
+    'South America': ['Argentina', 'Bolivia', 'Brazil', 'Chile', 'Colombia', 'Ecuador', 'Paraguay', 'Peru',
+                      'Uruguay', 'Venezuela'],
+    'North & Central America': ['Canada', 'Costa Rica', 'Cuba', 'Curacao', 'Dominican Republic', 'El Salvador',
+                                'Guatemala', 'Haiti', 'Honduras', 'Jamaica', 'Mexico', 'Panama',
+                                'Trinidad and Tobago', 'United States', 'Suriname'],
+    'Africa': ['Algeria', 'Angola', 'Benin', 'Burkina Faso', 'Burundi', 'Cameroon', 'Cape Verde Islands',
+               'Central African Republic', 'Chad', 'Comoros', 'Congo', 'Congo DR', 'Egypt', 'Equatorial Guinea',
+               'Gabon', 'Gambia', 'Ghana', 'Guinea', 'Guinea Bissau', "Côte d'Ivoire", 'Ivory Coast', 'Kenya',
+               'Liberia', 'Libya', 'Madagascar', 'Mali', 'Mauritania', 'Morocco', 'Mozambique', 'Namibia', 'Niger', 'Nigeria',
+               'Senegal', 'Sierra Leone', 'South Africa', 'Tanzania', 'Togo', 'Tunisia', 'Uganda', 'Zambia',
+               'Zimbabwe'],
+    'Asia': ['Australia', 'China PR', 'India', 'Indonesia', 'Iran', 'Iraq', 'Japan', 'Jordan', 'Korea Republic',
+             'Korea DPR', 'Lebanon', 'Malaysia', 'Philippines', 'Qatar', 'Saudi Arabia', 'Syria', 'Thailand',
+             'United Arab Emirates', 'Uzbekistan', 'Vietnam', 'Palestine', 'Oman', 'Kuwait', 'Bahrain'],
+    'Oceania': ['New Zealand', 'New Caledonia', 'Fiji', 'Papua New Guinea'],
+}
+
+NATION_REGIONS = {nation: region for region, nations in REGION_NATIONS.items() for nation in nations}
+
+
+class ValuationEngine:
+
+    def __init__(self, players_df):
+        players = players_df.copy()
+        nationality_col = 'nationality_name' if 'nationality_name' in players.columns else 'nationality'
+        club_col = 'club_name' if 'club_name' in players.columns else 'club'
+        players['nationality'] = players[nationality_col]
+        players['club'] = players[club_col]
+        players['region'] = players['nationality'].map(NATION_REGIONS).fillna('Other')
+        players['display_name'] = players['long_name'].fillna(players['short_name']) if 'long_name' in players.columns else players['short_name']
+
+        # Sorted search index of every name from each of its words on ('lionel messi', 'messi', 'l. messi'),
+        # so a prefix search (two binary searches) matches surnames too. Missing names become ''
+        players['name_key'] = players['display_name'].fillna('').str.casefold()
+        self.players = players.sort_values('name_key', kind='stable').reset_index(drop=True)
+        keys, positions = [], []
+        names = zip(self.players['name_key'], self.players['short_name'].fillna('').str.casefold())
+        for position, player_names in enumerate(names):
+            suffixes = {' '.join(words[i:]) for words in (name.split() for name in player_names) for i in range(len(words))}
+            keys.extend(suffixes)
+            positions.extend([position] * len(suffixes))
+        keys = np.array(keys, dtype=str)
+        order = np.argsort(keys, kind='stable')
+        self.search_keys = keys[order]
+        self.search_positions = np.array(positions, dtype=np.int64)[order]
+
+        valued = self.players.dropna(subset=['value_eur'])
+        self.by_region = valued.groupby('region').agg(
+            avg_value_eur=pd.NamedAgg(column='value_eur', aggfunc='mean'),
+            avg_wage_eur=pd.NamedAgg(column='wage_eur', aggfunc='mean'),
+            avg_overall=pd.NamedAgg(column='overall', aggfunc='mean'),
+            players=pd.NamedAgg(column='value_eur', aggfunc='size'),
+        ).reset_index()
+        self.by_nation = valued.groupby(['region', 'nationality']).agg(
+            avg_value_eur=pd.NamedAgg(column='value_eur', aggfunc='mean'),
+            avg_wage_eur=pd.NamedAgg(column='wage_eur', aggfunc='mean'),
+            avg_overall=pd.NamedAgg(column='overall', aggfunc='mean'),
+            players=pd.NamedAgg(column='value_eur', aggfunc='size'),
+        ).reset_index()
+
+        self.regions = sorted(self.players['region'].unique())
+        self.clubs = sorted(self.players['club'].dropna().unique())
+
+    def prefix_range(self, keys, prefix):
+        prefix = prefix.casefold()
+        start = np.searchsorted(keys, prefix, side='left')
+        end = np.searchsorted(keys, prefix + '\U0010ffff', side='left')
+        return start, end
+
+    # Function to find players with a full or short name word starting with the search text
+    def search(self, text, region=None, club=None, limit=50):
+        if text:
+            start, end = self.prefix_range(self.search_keys, ' '.join(text.split()))
+            matches = self.players.iloc[np.unique(self.search_positions[start:end])]
+        else:
+            matches = self.players
+        if region and region != 'All':
+            matches = matches[matches['region'] == region]
+        if club and club != 'All':
+            matches = matches[matches['club'] == club]
+        return matches.head(limit)
+
+    # Function to get the nations of a region with at least min_avg_value average valuation
+    def nation_valuations(self, regions=None, min_avg_value=0):
+        nations = self.by_nation
+        if regions:
+            nations = nations[nations['region'].isin(regions)]
+        return nations[nations['avg_value_eur'] >= min_avg_value]
+
+    # Function to get the average valuation of the selected regions
+    def region_valuations(self, regions=None):
+        if regions:
+            return self.by_region[self.by_region['region'].isin(regions)]
+        return self.by_region
+
+
+def create_region_average_chart(region_valuations):
+    return alt.Chart(region_valuations).mark_bar().encode(
+        x=alt.X('avg_value_eur:Q', title='Average Valuation (Euros)'),
+        y=alt.Y('region:N', title='Region', sort='-x'),
+        color=alt.Color('region:N', legend=None),
+        tooltip=['region:N', alt.Tooltip('avg_value_eur:Q', format=',.0f'), alt.Tooltip('avg_wage_eur:Q', format=',.0f'),
+                 alt.Tooltip('avg_overall:Q', format='.1f'), 'players:Q']
+    ).properties(width=700, height=alt.Step(24))
+
+
+def create_region_valuation_chart(nation_valuations):
+    return alt.Chart(nation_valuations).mark_bar().encode(
+        x=alt.X('avg_value_eur:Q', title='Average Valuation (Euros)'),
+        y=alt.Y('nationality:N', title='Nationality', sort='-x'),
+        color=alt.Color('region:N', legend=alt.Legend(title='Region', orient='top')),
+        tooltip=['nationality:N', 'region:N', alt.Tooltip('avg_value_eur:Q', format=',.0f'),
+                 alt.Tooltip('avg_wage_eur:Q', format=',.0f'), alt.Tooltip('avg_overall:Q', format='.1f'), 'players:Q']
+    ).properties(height=alt.Step(14), width=700)
+
+
+def create_player_attribute_chart(player):
+    attributes = pd.DataFrame({'attribute': [a.capitalize() for a in ATTRIBUTES],
+                               'rating': [player[a] for a in ATTRIBUTES]})
+    return alt.Chart(attributes).mark_bar().encode(
+        x=alt.X('rating:Q', title='Rating', scale=alt.Scale(domain=[0, 100])),
+        y=alt.Y('attribute:N', title='', sort=None),
+        tooltip=['attribute:N', 'rating:Q']
+    ).properties(width=700, height=220)